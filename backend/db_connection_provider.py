@@ -24,6 +24,16 @@ logger = logging.getLogger(__name__)
 # Load environment variables
 load_dotenv(os.path.join(os.path.dirname(__file__), ".env"), override=True)
 
+# Indexes added after the initial schema; created on existing provider databases on first connect
+PROVIDER_INDEX_MIGRATIONS = [
+    ('medications', 'idx_extraction_type_created', '(patient_extraction_id, medication_type, created_at)'),
+    ('diagnoses', 'idx_extraction_type_created', '(patient_extraction_id, diagnosis_type, created_at)'),
+    ('allergies', 'idx_extraction_type_created', '(patient_extraction_id, allergy_type, created_at)'),
+    ('health_concerns', 'idx_extraction_type_created', '(patient_extraction_id, concern_type, created_at)'),
+    # ngram FULLTEXT so partial patient name searches avoid a LIKE '%...%' table scan
+    ('patients', 'ft_patient_name', '(patient_name) WITH PARSER ngram'),
+]
+
 class ProviderDatabaseManager:
     """
     Manages provider-specific databases with complete data isolation
@@ -51,6 +61,9 @@ class ProviderDatabaseManager:
         # Cache for database connections
         self.connections = {}
         
+        # Provider databases whose index migrations were attempted in this process
+        self.migrated_databases = set()
+        
         # Initialize system database
         self._initialize_system_database()
     
@@ -275,7 +288,8 @@ class ProviderDatabaseManager:
                 INDEX idx_prn (prn),
                 INDEX idx_patient_uuid (patient_uuid),
                 INDEX idx_patient_name (patient_name),
-                INDEX idx_date_of_birth (date_of_birth)
+                INDEX idx_date_of_birth (date_of_birth),
+                FULLTEXT INDEX ft_patient_name (patient_name) WITH PARSER ngram
             ) ENGINE=InnoDB COMMENT='Patient demographics with PRN as primary identifier'
         """)
         
@@ -361,7 +375,7 @@ class ProviderDatabaseManager:
                 
                 FOREIGN KEY (patient_extraction_id) REFERENCES patient_extractions(id) ON DELETE CASCADE,
                 
-                INDEX idx_patient_extraction_id (patient_extraction_id),
+                INDEX idx_extraction_type_created (patient_extraction_id, medication_type, created_at),
                 INDEX idx_medication_name (medication_name),
                 INDEX idx_medication_type (medication_type),
                 INDEX idx_medication_strength (medication_strength)
@@ -386,7 +400,7 @@ class ProviderDatabaseManager:
                 
                 FOREIGN KEY (patient_extraction_id) REFERENCES patient_extractions(id) ON DELETE CASCADE,
                 
-                INDEX idx_patient_extraction_id (patient_extraction_id),
+                INDEX idx_extraction_type_created (patient_extraction_id, diagnosis_type, created_at),
                 INDEX idx_diagnosis_text (diagnosis_text),
                 INDEX idx_diagnosis_type (diagnosis_type),
                 INDEX idx_diagnosis_code (diagnosis_code)
@@ -410,7 +424,7 @@ class ProviderDatabaseManager:
                 
                 FOREIGN KEY (patient_extraction_id) REFERENCES patient_extractions(id) ON DELETE CASCADE,
                 
-                INDEX idx_patient_extraction_id (patient_extraction_id),
+                INDEX idx_extraction_type_created (patient_extraction_id, allergy_type, created_at),
                 INDEX idx_allergy_type (allergy_type),
                 INDEX idx_allergy_name (allergy_name),
                 INDEX idx_allergen (allergen)
@@ -436,7 +450,7 @@ class ProviderDatabaseManager:
                 
                 FOREIGN KEY (patient_extraction_id) REFERENCES patient_extractions(id) ON DELETE CASCADE,
                 
-                INDEX idx_patient_extraction_id (patient_extraction_id),
+                INDEX idx_extraction_type_created (patient_extraction_id, concern_type, created_at),
                 INDEX idx_concern_type (concern_type),
                 INDEX idx_status (status),
                 INDEX idx_priority (priority)
@@ -546,6 +560,49 @@ class ProviderDatabaseManager:
             logger.error(f"Provider database connection error for {database_name}: {err}")
             raise
     
+    def apply_index_migrations(self, database_name: str):
+        """
+        Create any PROVIDER_INDEX_MIGRATIONS index missing from a provider database.
+        Run from setup, not per connection, since building an index can rebuild the table.
+        
+        Args:
+            database_name: Provider database to migrate
+        """
+        if database_name in self.migrated_databases:
+            return
+        
+        config = self.mysql_config.copy()
+        config['database'] = database_name
+        conn = mysql.connector.connect(**config)
+        try:
+            self._apply_index_migrations(conn, database_name)
+        finally:
+            conn.close()
+    
+    def _apply_index_migrations(self, conn, database_name: str):
+        """Create the missing migration indexes over an open provider connection"""
+        cursor = conn.cursor()
+        try:
+            cursor.execute("""
+                SELECT DISTINCT table_name, index_name
+                FROM information_schema.statistics
+                WHERE table_schema = %s
+            """, (database_name,))
+            existing = {(table, index) for table, index in cursor.fetchall()}
+            
+            for table, index_name, columns in PROVIDER_INDEX_MIGRATIONS:
+                if (table, index_name) not in existing:
+                    kind = 'FULLTEXT INDEX' if index_name.startswith('ft_') else 'INDEX'
+                    cursor.execute(f"CREATE {kind} {index_name} ON {table} {columns}")
+                    logger.info(f"Created index {index_name} on {database_name}.{table}")
+            
+        except Error as e:
+            logger.warning(f"Index migration skipped for {database_name}: {e}")
+        finally:
+            # Attempted once per process either way, so a failing DDL is not retried
+            self.migrated_databases.add(database_name)
+            cursor.close()
+    
     def list_providers(self) -> List[Dict[str, Any]]:
         """Get list of all registered providers"""
         try:
@@ -30,15 +30,17 @@ Features:
 """
 
 import asyncio
+import gzip
 import json
 import logging
 import re
+import sys
 import time
 import uuid
-from collections import defaultdict
+from collections import defaultdict, deque
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Any, Dict, List, Literal, Optional, Pattern, Set, Union
+from typing import Any, BinaryIO, ClassVar, Deque, Dict, List, Literal, Optional, Pattern, Set
 from urllib.parse import urljoin, urlparse
 import argparse
 import base64
@@ -50,6 +52,7 @@ try:
     from flask import Blueprint, Flask, jsonify, request
     from flask_socketio import SocketIO, emit
     from playwright.async_api import async_playwright, Browser, Page, BrowserContext
+    from playwright.async_api import TimeoutError as PlaywrightTimeoutError
     from pydantic import BaseModel, Field, validator
     from cryptography.fernet import Fernet
     DEPENDENCIES_AVAILABLE = True
@@ -57,6 +60,11 @@ except ImportError as e:
     DEPENDENCIES_AVAILABLE = False
     import_error = str(e)
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -68,6 +76,76 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Flush threshold for batched NDJSON log writes
+LOG_WRITE_BUFFER_SIZE = 1024 * 1024
+
+# Logs are highly repetitive; level 1 gets most of the size reduction for little CPU
+LOG_COMPRESS_LEVEL = 1
+
+# Number of most recent events kept in memory; the full trace is streamed to disk
+RECENT_EVENTS_LIMIT = 500
+
+# Maximum number of distinct header values/URLs shared across network events
+STRING_POOL_MAX_SIZE = 4096
+
+# Most recent JSON API responses kept per page for matching tables to endpoints
+PAGE_API_RESPONSES_KEPT = 10
+
+# Live updates are sent to SocketIO clients in batches of up to this many events...
+EMIT_BATCH_SIZE = 50
+
+# ...or whatever arrived within this window (seconds) after the first one
+EMIT_BATCH_INTERVAL = 0.02
+
+# Default PHI patterns; every one of them needs at least one digit to match
+DEFAULT_REDACTION_PATTERNS = (
+    r'\b\d{3}-\d{2}-\d{4}\b',  # SSN
+    r'\b\d{2}/\d{2}/\d{4}\b',  # DOB
+    r'\b[A-Z]{2}\d{6,}\b',     # MRN
+    r'\b\d{4}\s?\d{4}\s?\d{4}\s?\d{4}\b'  # Credit Card
+)
+
+DIGIT_PATTERN = re.compile(r'\d')
+
+# Resource types aborted when block_heavy_resources is enabled; stylesheets always
+# load, since without them CSS-hidden dialogs and overlays show up as popups
+BLOCKED_RESOURCE_TYPES = frozenset({
+    'image', 'font', 'media', 'texttrack', 'beacon', 'csp_report', 'imageset'
+})
+
+# Integer event tags for cheap type dispatch on hot paths
+CLICK_TAG = 1
+INPUT_TAG = 2
+NETWORK_TAG = 3
+NAVIGATION_TAG = 4
+POPUP_TAG = 5
+
+
+def _json_array_lengths(body: str) -> Set[int]:
+    """Lengths of the arrays at the top two levels of a JSON body."""
+    try:
+        data = orjson.loads(body) if orjson is not None else json.loads(body)
+    except ValueError:
+        return set()
+    
+    lengths = set()
+    pending = [(data, 0)]
+    while pending:
+        value, depth = pending.pop()
+        if isinstance(value, list):
+            lengths.add(len(value))
+        elif isinstance(value, dict) and depth < 2:
+            pending.extend((child, depth + 1) for child in value.values())
+    return lengths
+
+
+def dumps_json(data: Any) -> bytes:
+    """Serialize data to JSON bytes, using orjson when it is installed."""
+    if orjson is not None:
+        # Datetimes go through default=str so both paths write the same log format
+        return orjson.dumps(data, default=str, option=orjson.OPT_PASSTHROUGH_DATETIME)
+    return json.dumps(data, default=str, separators=(',', ':'), ensure_ascii=False).encode()
+
 
 class InspectorConfig(BaseModel):
     """Configuration model for the Live Portal Inspector."""
@@ -82,12 +160,7 @@ class InspectorConfig(BaseModel):
     timeout_minutes: int = Field(default=30, description="Maximum inspection duration in minutes")
     headless: bool = Field(default=False, description="Run browser in headless mode")
     redaction_patterns: List[str] = Field(
-        default_factory=lambda: [
-            r'\b\d{3}-\d{2}-\d{4}\b',  # SSN
-            r'\b\d{2}/\d{2}/\d{4}\b',  # DOB
-            r'\b[A-Z]{2}\d{6,}\b',     # MRN
-            r'\b\d{4}\s?\d{4}\s?\d{4}\s?\d{4}\b'  # Credit Card
-        ],
+        default_factory=lambda: list(DEFAULT_REDACTION_PATTERNS),
         description="Regex patterns for PHI redaction"
     )
     selector_strategy: Literal['id', 'data-attr', 'class-chain', 'nth-child'] = Field(
@@ -95,6 +168,28 @@ class InspectorConfig(BaseModel):
         description="Primary selector generation strategy"
     )
     encryption_key: Optional[str] = Field(default=None, description="Optional encryption key for logs")
+    screenshot_format: Literal['png', 'jpeg'] = Field(
+        default='jpeg',
+        description="Screenshot image format: png or jpeg"
+    )
+    screenshot_quality: int = Field(default=70, description="Screenshot quality (0-100) for lossy formats")
+    screenshot_full_page: bool = Field(default=False, description="Capture the full scrollable page instead of the viewport")
+    capture_resource_types: Set[str] = Field(
+        default_factory=lambda: {'xhr', 'fetch', 'document'},
+        description="Playwright resource types recorded as network events"
+    )
+    block_heavy_resources: bool = Field(
+        default=False,
+        description=(
+            "Abort image, font and media requests during inspection. Every request then "
+            "waits on a Python route handler, so only enable it when the caller keeps the "
+            "event loop running between start_inspection and stop_inspection"
+        )
+    )
+    capture_url_pattern: Optional[str] = Field(
+        default=None,
+        description="Optional regex; only request URLs matching it are recorded"
+    )
     
     @validator('output_dir')
     def create_output_dir(cls, v):
@@ -106,6 +201,7 @@ class InspectorConfig(BaseModel):
 class EventModel(BaseModel):
     """Base event model with common fields."""
     
+    event_tag: ClassVar[int] = 0
     event_id: str = Field(default_factory=lambda: str(uuid.uuid4()))
     timestamp: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
     page_url: str
@@ -116,6 +212,7 @@ class EventModel(BaseModel):
 class ClickEvent(EventModel):
     """Click event with element details."""
     
+    event_tag: ClassVar[int] = CLICK_TAG
     event_type: str = "click"
     selector: str
     tag_name: str
@@ -129,6 +226,7 @@ class ClickEvent(EventModel):
 class InputEvent(EventModel):
     """Input event with form field details."""
     
+    event_tag: ClassVar[int] = INPUT_TAG
     event_type: str = "input"
     selector: str
     input_type: str
@@ -141,6 +239,7 @@ class InputEvent(EventModel):
 class NavigationEvent(EventModel):
     """Navigation event for page loads and SPA transitions."""
     
+    event_tag: ClassVar[int] = NAVIGATION_TAG
     event_type: str = "navigation"
     navigation_type: Literal['load', 'spa', 'iframe']
     from_url: Optional[str] = None
@@ -153,6 +252,7 @@ class NavigationEvent(EventModel):
 class NetworkEvent(EventModel):
     """Network request/response event."""
     
+    event_tag: ClassVar[int] = NETWORK_TAG
     event_type: str = "network"
     request_url: str
     method: str
@@ -167,6 +267,7 @@ class NetworkEvent(EventModel):
 class PopupEvent(EventModel):
     """Popup/modal dialog event."""
     
+    event_tag: ClassVar[int] = POPUP_TAG
     event_type: str = "popup"
     popup_selector: str
     trigger_selector: Optional[str] = None
@@ -177,71 +278,242 @@ class PopupEvent(EventModel):
     screenshot_path: Optional[str] = None
 
 
-class SelectorGenerator:
-    """Advanced selector generation with multiple strategies."""
-    
-    def __init__(self, strategy: str = 'id'):
-        self.strategy = strategy
-        self.js_helper = """
-        window.generateSelector = function(element) {
-            if (!element || element.nodeType !== 1) return '';
-            
-            // Strategy 1: ID
-            if (element.id) {
-                return '#' + element.id;
+SELECTOR_HELPER_JS = """
+(() => {
+    // Selectors are memoized per element identity; the WeakMap lets
+    // detached elements be garbage collected
+    const selectorCache = new WeakMap();
+
+    // A memoized selector is only reused while it still resolves to its element;
+    // class and nth-child selectors go stale as SPAs re-render
+    const stillSelects = function(selector, element) {
+        try {
+            return document.querySelector(selector) === element;
+        } catch (e) {
+            return false;
+        }
+    };
+
+    const computeSelector = function(element) {
+        // Strategy 1: ID
+        if (element.id) {
+            return '#' + element.id;
+        }
+
+        // Strategy 2: Data attributes
+        const dataAttrs = ['data-test', 'data-testid', 'data-cy', 'data-qa'];
+        for (const attr of dataAttrs) {
+            if (element.hasAttribute(attr)) {
+                return `[${attr}="${element.getAttribute(attr)}"]`;
             }
-            
-            // Strategy 2: Data attributes
-            const dataAttrs = ['data-test', 'data-testid', 'data-cy', 'data-qa'];
-            for (const attr of dataAttrs) {
-                if (element.hasAttribute(attr)) {
-                    return `[${attr}="${element.getAttribute(attr)}"]`;
-                }
+        }
+
+        // Strategy 3: Class chain
+        const classes = Array.from(element.classList);
+        if (classes.length > 0) {
+            const classSelector = '.' + classes.join('.');
+            const siblings = Array.from(element.parentElement?.children || []);
+            const matchingSiblings = siblings.filter(s => s.matches(classSelector));
+            if (matchingSiblings.length === 1) {
+                return classSelector;
             }
-            
-            // Strategy 3: Class chain
-            const classes = Array.from(element.classList);
-            if (classes.length > 0) {
-                const classSelector = '.' + classes.join('.');
-                const siblings = Array.from(element.parentElement?.children || []);
-                const matchingSiblings = siblings.filter(s => s.matches(classSelector));
-                if (matchingSiblings.length === 1) {
-                    return classSelector;
-                }
+        }
+
+        // Strategy 4: nth-child fallback
+        let path = [];
+        let current = element;
+
+        while (current && current.nodeType === 1 && current !== document.body) {
+            let selector = current.tagName.toLowerCase();
+
+            if (current.id) {
+                selector = '#' + current.id;
+                path.unshift(selector);
+                break;
             }
-            
-            // Strategy 4: nth-child fallback
-            let path = [];
-            let current = element;
-            
-            while (current && current.nodeType === 1 && current !== document.body) {
-                let selector = current.tagName.toLowerCase();
-                
-                if (current.id) {
-                    selector = '#' + current.id;
-                    path.unshift(selector);
-                    break;
-                }
-                
-                const siblings = Array.from(current.parentElement?.children || []);
-                const sameTagSiblings = siblings.filter(s => s.tagName === current.tagName);
-                
-                if (sameTagSiblings.length > 1) {
-                    const index = sameTagSiblings.indexOf(current) + 1;
-                    selector += `:nth-child(${index})`;
+
+            const siblings = Array.from(current.parentElement?.children || []);
+            const sameTagSiblings = siblings.filter(s => s.tagName === current.tagName);
+
+            if (sameTagSiblings.length > 1) {
+                const index = sameTagSiblings.indexOf(current) + 1;
+                selector += `:nth-child(${index})`;
+            }
+
+            path.unshift(selector);
+            current = current.parentElement;
+        }
+
+        return path.join(' > ');
+    };
+
+    window.generateSelector = function(element) {
+        if (!element || element.nodeType !== 1) return '';
+
+        let selector = selectorCache.get(element);
+        if (selector === undefined || !stillSelects(selector, element)) {
+            selector = computeSelector(element);
+            selectorCache.set(element, selector);
+        }
+        return selector;
+    };
+})();
+"""
+
+CLICK_LISTENER_JS = """
+document.addEventListener('click', (event) => {
+    const clickId = 'click_' + Date.now() + '_' + Math.random();
+    event.target.setAttribute('data-click-id', clickId);
+
+    console.log('CLICK_EVENT:' + JSON.stringify({
+        clickId: clickId,
+        tagName: event.target.tagName,
+        id: event.target.id,
+        classes: Array.from(event.target.classList),
+        attributes: Object.fromEntries(
+            Array.from(event.target.attributes).map(attr => [attr.name, attr.value])
+        ),
+        textContent: event.target.textContent,
+        coordinates: { x: event.clientX, y: event.clientY }
+    }));
+}, true);
+"""
+
+# Common popup/modal selectors
+POPUP_SELECTORS = (
+    '[role="dialog"]',
+    '.modal',
+    '.popup',
+    '.overlay',
+    '[data-modal]',
+    '.dialog'
+)
+
+# Playwright selector matching the first visible popup of any kind
+VISIBLE_POPUP_SELECTOR = ', '.join(f'{selector}:visible' for selector in POPUP_SELECTORS)
+
+# How long to wait for a popup to appear after a click
+POPUP_WAIT_TIMEOUT_MS = 150
+
+# Reports each popup to Python (via the __onPopup binding) when it becomes
+# visible, instead of polling the DOM after every click
+POPUP_OBSERVER_JS = """
+(() => {
+    const POPUP_SELECTOR = """ + json.dumps(', '.join(POPUP_SELECTORS)) + """;
+    const isVisible = el => (el.offsetWidth || el.offsetHeight || el.getClientRects().length) > 0
+        && getComputedStyle(el).visibility !== 'hidden';
+
+    const scan = () => {
+        if (typeof window.__onPopup !== 'function') return;
+        for (const el of document.querySelectorAll(POPUP_SELECTOR)) {
+            if (isVisible(el)) {
+                if (!el.__popupSeen) {
+                    el.__popupSeen = true;
+                    window.__onPopup(el);
                 }
-                
-                path.unshift(selector);
-                current = current.parentElement;
+            } else {
+                el.__popupSeen = false;
             }
-            
-            return path.join(' > ');
+        }
+    };
+
+    // Coalesce mutation bursts into one scan per animation frame
+    let scheduled = false;
+    const observer = new MutationObserver(() => {
+        if (scheduled) return;
+        scheduled = true;
+        requestAnimationFrame(() => {
+            scheduled = false;
+            scan();
+        });
+    });
+
+    const start = () => observer.observe(document.documentElement, {
+        childList: true,
+        subtree: true,
+        attributes: true,
+        attributeFilter: ['style', 'class', 'open', 'hidden']
+    });
+    if (document.documentElement) {
+        start();
+    } else {
+        document.addEventListener('DOMContentLoaded', start);
+    }
+})();
+"""
+
+# Collects form and table descriptors, including selectors, for the whole page
+PAGE_STRUCTURE_JS = """
+() => {
+    // Prefer the injected helper; fall back to a plain nth-of-type path
+    const computePath = el => {
+        if (typeof window.generateSelector === 'function') {
+            return window.generateSelector(el) || 'unknown';
+        }
+        const path = [];
+        for (let current = el; current && current.nodeType === 1 && current !== document.body; current = current.parentElement) {
+            if (current.id) {
+                path.unshift('#' + current.id);
+                break;
+            }
+            const tag = current.tagName.toLowerCase();
+            const sameTag = Array.from(current.parentElement?.children || []).filter(s => s.tagName === current.tagName);
+            path.unshift(sameTag.length > 1 ? `${tag}:nth-of-type(${sameTag.indexOf(current) + 1})` : tag);
+        }
+        return path.join(' > ') || 'unknown';
+    };
+
+    const snapshotForm = form => ({
+        action: form.action,
+        method: form.method,
+        fields: Array.from(form.querySelectorAll('input, select, textarea')).map(field => ({
+            name: field.name,
+            type: field.type,
+            placeholder: field.placeholder,
+            label: field.labels?.[0]?.textContent || '',
+            required: field.required
+        })),
+        selector: computePath(form)
+    });
+
+    const snapshotTable = table => {
+        const rows = table.querySelectorAll('tbody tr, tr');
+        return {
+            headers: Array.from(table.querySelectorAll('th')).map(th => th.textContent.trim()),
+            rowCount: rows.length,
+            dataRowCount: Array.from(rows).filter(row => row.querySelector('td')).length,
+            sampleData: Array.from(rows).slice(0, 3).map(row =>
+                Array.from(row.querySelectorAll('td')).map(td => td.textContent.trim())
+            ),
+            selector: computePath(table)
         };
-        """
+    };
+
+    // One document walk for both element kinds, split by tag name
+    const forms = [];
+    const tables = [];
+    for (const el of document.querySelectorAll('form, table')) {
+        if (el.tagName === 'FORM') {
+            forms.push(snapshotForm(el));
+        } else {
+            tables.push(snapshotTable(el));
+        }
+    }
+
+    return { forms, tables };
+}
+"""
+
+# Single init script registered once per browser context so every page and
+# frame inherits the helpers before any document script runs
+INSPECTOR_INIT_JS = SELECTOR_HELPER_JS + CLICK_LISTENER_JS + POPUP_OBSERVER_JS
+
+
+class SelectorGenerator:
+    """Advanced selector generation with multiple strategies."""
     
-    async def inject_helper(self, page: Page) -> None:
-        """Inject selector generation helper into page."""
-        await page.add_init_script(self.js_helper)
+    def __init__(self, strategy: str = 'id'):
+        self.strategy = strategy
     
     async def generate_selector(self, page: Page, element_handle) -> str:
         """Generate optimal selector for element."""
@@ -256,16 +528,76 @@ class SelectorGenerator:
             return 'unknown'
 
 
+class KeywordClassifier:
+    """Multi-keyword substring classifier backed by a single precompiled regex."""
+    
+    def __init__(self, keyword_map: Dict[str, List[str]]):
+        self.categories = list(keyword_map)
+        self.ranks: Dict[str, int] = {}
+        for rank, keywords in enumerate(keyword_map.values()):
+            for keyword in keywords:
+                self.ranks.setdefault(keyword, rank)
+        
+        # A lookahead reports a match at every position (overlaps included); with
+        # alternatives in category order, each position yields its best category
+        alternation = '|'.join(re.escape(keyword) for keyword in self.ranks)
+        self.pattern = re.compile(f'(?=({alternation}))')
+    
+    def classify(self, text: str) -> Optional[str]:
+        """Return the first category (in declaration order) with a keyword in text."""
+        best = None
+        for keyword in self.pattern.findall(text):
+            rank = self.ranks[keyword]
+            if best is None or rank < best:
+                best = rank
+                if rank == 0:
+                    break
+        return self.categories[best] if best is not None else None
+
+
+DEMOGRAPHIC_KEYWORDS = {
+    'name': ['name', 'first_name', 'last_name', 'full_name'],
+    'dob': ['dob', 'date_of_birth', 'birthdate', 'birth_date'],
+    'ssn': ['ssn', 'social_security', 'social_security_number'],
+    'address': ['address', 'street', 'city', 'state', 'zip', 'postal'],
+    'phone': ['phone', 'telephone', 'mobile', 'cell'],
+    'email': ['email', 'e_mail', 'mail'],
+    'gender': ['gender', 'sex'],
+    'race': ['race', 'ethnicity', 'ethnic'],
+    'insurance': ['insurance', 'provider', 'policy', 'subscriber']
+}
+
+MEDICAL_SECTION_KEYWORDS = {
+    'demographics': ['patient', 'personal', 'contact', 'emergency'],
+    'medications': ['medication', 'drugs', 'prescriptions', 'pharmacy'],
+    'labs': ['lab', 'laboratory', 'test', 'results', 'blood', 'urine'],
+    'vitals': ['vital', 'blood_pressure', 'temperature', 'weight', 'height'],
+    'allergies': ['allergy', 'allergies', 'adverse', 'reaction'],
+    'appointments': ['appointment', 'schedule', 'visit', 'calendar'],
+    'procedures': ['procedure', 'surgery', 'operation', 'treatment'],
+    'history': ['history', 'medical_history', 'past', 'previous'],
+    'insurance': ['insurance', 'billing', 'payment', 'coverage']
+}
+
+DEMOGRAPHIC_CLASSIFIER = KeywordClassifier(DEMOGRAPHIC_KEYWORDS)
+MEDICAL_SECTION_CLASSIFIER = KeywordClassifier(MEDICAL_SECTION_KEYWORDS)
+
+
 class PHIRedactor:
     """PHI redaction utility with pattern matching."""
     
     def __init__(self, patterns: List[str]):
         self.patterns = [re.compile(pattern, re.IGNORECASE) for pattern in patterns]
+        # Text without digits can't match when only digit-bearing patterns are in use
+        self.digit_prefilter = all(pattern in DEFAULT_REDACTION_PATTERNS for pattern in patterns)
     
     def redact_text(self, text: str) -> str:
         """Redact PHI from text using configured patterns."""
         if not text:
             return text
+        
+        if self.digit_prefilter and not DIGIT_PATTERN.search(text):
+            return text
             
         redacted = text
         for pattern in self.patterns:
@@ -286,24 +618,42 @@ class PHIRedactor:
 class ScreenshotManager:
     """Screenshot capture and management."""
     
-    def __init__(self, output_dir: Path):
+    def __init__(
+        self,
+        output_dir: Path,
+        image_format: str = 'jpeg',
+        quality: int = 70,
+        full_page: bool = False
+    ):
         self.output_dir = output_dir
         self.screenshot_dir = output_dir / "screenshots"
         self.screenshot_dir.mkdir(parents=True, exist_ok=True)
+        self.image_format = image_format
+        self.quality = quality
+        self.full_page = full_page
     
     async def capture_screenshot(
         self, 
         page: Page, 
         inspection_id: str, 
-        screenshot_type: str = "page"
+        screenshot_type: str = "page",
+        element_handle=None
     ) -> str:
-        """Capture and save screenshot."""
+        """Capture and save screenshot (clipped to element_handle if given)."""
         timestamp = int(time.time() * 1000)
-        filename = f"{inspection_id}_{screenshot_type}_{timestamp}.png"
+        extension = 'jpg' if self.image_format == 'jpeg' else self.image_format
+        filename = f"{inspection_id}_{screenshot_type}_{timestamp}.{extension}"
         filepath = self.screenshot_dir / filename
         
+        options = {'path': str(filepath), 'type': self.image_format}
+        if self.image_format != 'png':
+            options['quality'] = self.quality
+        
         try:
-            await page.screenshot(path=str(filepath), full_page=True)
+            if element_handle is not None:
+                await element_handle.screenshot(**options)
+            else:
+                await page.screenshot(full_page=self.full_page, **options)
             logger.info(f"Screenshot saved: {filepath}")
             return str(filepath)
         except Exception as e:
@@ -330,6 +680,139 @@ class ScreenshotManager:
             return {}
 
 
+REPLAY_ADAPTER_TEMPLATE = '''#!/usr/bin/env python3
+"""
+Auto-generated Portal Replay Adapter
+Generated from inspection: {{ inspection_id }}
+Portal: {{ portal_name }}
+Date: {{ generation_date }}
+"""
+
+import asyncio
+import json
+from pathlib import Path
+from playwright.async_api import async_playwright
+
+CREDENTIALS = {
+    'username': 'YOUR_USERNAME_HERE',
+    'password': 'YOUR_PASSWORD_HERE'
+}
+
+# Returns every non-empty row of a table as a list of trimmed cell texts
+TABLE_ROWS_JS = """
+(selector) => {
+    const rows = document.querySelectorAll(`${selector} tbody tr, ${selector} tr`);
+    return Array.from(rows)
+        .map(row => Array.from(row.querySelectorAll('td'), cell => cell.innerText.trim()))
+        .filter(cells => cells.length > 0);
+}
+"""
+
+class PortalAdapter:
+    """{{ portal_name }} Portal Adapter"""
+    
+    def __init__(self):
+        self.browser = None
+        self.context = None
+        self.page = None
+    
+    async def start_browser(self):
+        """Initialize browser and context."""
+        playwright = await async_playwright().start()
+        self.browser = await playwright.chromium.launch(headless=False)
+        self.context = await self.browser.new_context(
+            viewport={'width': 1920, 'height': 1080}
+        )
+        self.page = await self.context.new_page()
+    
+    async def login(self):
+        """Perform login sequence."""
+        await self.page.goto('{{ portal_url }}')
+        await self.page.wait_for_load_state('networkidle')
+        
+        {% for form in forms %}
+        {% if 'login' in form.action.lower() or 'signin' in form.action.lower() %}
+        # Login form found: {{ form.selector }}
+        {% for field in form.fields %}
+        {% if 'username' in field.name.lower() or 'email' in field.name.lower() %}
+        await self.page.fill('{{ form.selector }} input[name="{{ field.name }}"]', CREDENTIALS['username'])
+        {% elif 'password' in field.name.lower() %}
+        await self.page.fill('{{ form.selector }} input[name="{{ field.name }}"]', CREDENTIALS['password'])
+        {% endif %}
+        {% endfor %}
+        
+        await self.page.click('{{ form.selector }} input[type="submit"], {{ form.selector }} button[type="submit"]')
+        await self.page.wait_for_load_state('networkidle')
+        {% endif %}
+        {% endfor %}
+    
+    async def fetch_api_data(self, endpoint):
+        """Fetch table data straight from the JSON API that populates it."""
+        response = await self.page.request.get(endpoint)
+        if response.ok:
+            return await response.json()
+        return None
+    
+    async def scrape_table(self, selector):
+        """Scrape table rows from the rendered DOM in a single round-trip."""
+        return await self.page.evaluate(TABLE_ROWS_JS, selector)
+    
+    async def extract_table_data(self):
+        """Extract data from discovered tables, preferring their JSON APIs."""
+        {% for table in tables %}
+        try:
+            table_data = None
+            {% if table.api_endpoint %}
+            # This table's page loaded its data from a JSON API
+            table_data = await self.fetch_api_data({{ table.api_endpoint | tojson }})
+            if table_data is not None:
+                print("Extracted table data from API")
+            {% endif %}
+            if table_data is None:
+                table_element = await self.page.query_selector('{{ table.selector }}')
+                if table_element:
+                    headers = {{ table.headers | tojson }}
+                    table_data = await self.scrape_table('{{ table.selector }}')
+                    print(f"Extracted table data: {len(table_data)} rows")
+                
+        except Exception as e:
+            print(f"Table extraction error: {e}")
+        {% endfor %}
+    
+    async def run_full_sequence(self):
+        """Run complete portal interaction sequence."""
+        try:
+            await self.start_browser()
+            print("Browser started")
+            await self.login()
+            print("Login completed")
+            await self.extract_table_data()
+            print("Data extraction completed")
+            
+        except Exception as e:
+            print(f"Adapter execution error: {e}")
+        
+        finally:
+            if self.browser:
+                await self.browser.close()
+
+async def main():
+    """Main execution function."""
+    adapter = PortalAdapter()
+    await adapter.run_full_sequence()
+
+if __name__ == "__main__":
+    asyncio.run(main())
+'''
+
+# Parsed once at import; trim_blocks/lstrip_blocks keep tag-only lines out of the output
+REPLAY_ADAPTER_JINJA = (
+    jinja2.Environment(autoescape=False, trim_blocks=True, lstrip_blocks=True)
+    .from_string(REPLAY_ADAPTER_TEMPLATE)
+    if DEPENDENCIES_AVAILABLE else None
+)
+
+
 class LivePortalInspector:
     """Main inspector class implementing comprehensive portal analysis."""
     
@@ -341,7 +824,12 @@ class LivePortalInspector:
         self.socketio = socketio
         self.selector_generator = SelectorGenerator(config.selector_strategy)
         self.phi_redactor = PHIRedactor(config.redaction_patterns)
-        self.screenshot_manager = ScreenshotManager(config.output_dir)
+        self.screenshot_manager = ScreenshotManager(
+            config.output_dir,
+            image_format=config.screenshot_format,
+            quality=config.screenshot_quality,
+            full_page=config.screenshot_full_page
+        )
         
         # State management
         self.inspection_id: Optional[str] = None
@@ -349,14 +837,36 @@ class LivePortalInspector:
         self.context: Optional[BrowserContext] = None
         self.page: Optional[Page] = None
         self.is_recording = False
-        self.events: List[EventModel] = []
+        self.events: Deque[EventModel] = deque(maxlen=RECENT_EVENTS_LIMIT)
+        self.events_count = 0
+        self.event_type_counts: List[int] = [0] * (POPUP_TAG + 1)
+        
+        # Streaming NDJSON log state
+        self.log_path: Optional[Path] = None
+        self._log_file: Optional[BinaryIO] = None
+        self._log_buffer: List[bytes] = []
+        self._log_buffered = 0
+        self._pending_requests: Dict[str, List[NetworkEvent]] = defaultdict(list)
+        
+        # Live update queue drained by a background task so emits never block recording
+        self._emit_queue: Optional[asyncio.Queue] = None
+        self._emit_task: Optional[asyncio.Task] = None
         
         # Analysis data
         self.forms_discovered: List[Dict[str, Any]] = []
         self.tables_discovered: List[Dict[str, Any]] = []
         self.navigation_flow: List[str] = []
         self.api_endpoints: Set[str] = set()
+        # Page URL -> recent (endpoint URL, redacted body) pairs loaded by that page
+        self.page_api_responses: Dict[str, Deque[tuple]] = defaultdict(
+            lambda: deque(maxlen=PAGE_API_RESPONSES_KEPT)
+        )
         self.popup_dialogs: List[Dict[str, Any]] = []
+        self.last_click_selector: Optional[str] = None
+        self.popup_observer_active = False
+        
+        # Shared pool for header values and URLs repeated across network events
+        self._string_pool: Dict[str, str] = {}
         
         # Setup encryption if key provided
         self.cipher = None
@@ -374,10 +884,20 @@ class LivePortalInspector:
         self.inspection_id = str(uuid.uuid4())
         self.is_recording = True
         self.events.clear()
+        self.events_count = 0
+        self.event_type_counts = [0] * (POPUP_TAG + 1)
         
         logger.info(f"Starting inspection {self.inspection_id} for {self.config.portal_url}")
         
         try:
+            # Open the NDJSON log so events are persisted as they arrive
+            self._open_inspection_log()
+            
+            # Start batching live updates before the first event is recorded
+            if self.socketio:
+                self._emit_queue = asyncio.Queue()
+                self._emit_task = asyncio.create_task(self._emit_loop())
+            
             # Launch browser
             playwright = await async_playwright().start()
             self.browser = await playwright.chromium.launch(headless=self.config.headless)
@@ -386,12 +906,23 @@ class LivePortalInspector:
                 record_video_dir=str(self.config.output_dir / "videos" / self.inspection_id)
             )
             
+            # Register selector helper, click tracking and popup observer once for all pages
+            await self.context.add_init_script(INSPECTOR_INIT_JS)
+            try:
+                await self.context.expose_binding('__onPopup', self._handle_popup_binding, handle=True)
+                self.popup_observer_active = True
+            except Exception as e:
+                logger.warning(f"Popup observer unavailable, falling back to polling: {e}")
+            
+            # Skip assets the structural analysis doesn't need
+            if self.config.block_heavy_resources:
+                await self.context.route('**/*', self._route_request)
+            
             # Setup request/response interception
             await self._setup_network_interception()
             
             # Create main page
             self.page = await self.context.new_page()
-            await self.selector_generator.inject_helper(self.page)
             
             # Setup event listeners
             await self._setup_event_listeners()
@@ -426,12 +957,15 @@ class LivePortalInspector:
         self.is_recording = False
         
         try:
+            # Flush and close the streamed logs
+            await self._save_inspection_logs()
+            
+            # Deliver any live updates still queued
+            await self._stop_emit_loop()
+            
             # Perform final analysis
             analysis = await self._perform_comprehensive_analysis()
             
-            # Save logs
-            await self._save_inspection_logs()
-            
             # Generate adapter
             adapter_path = await self._generate_replay_adapter()
             
@@ -442,10 +976,10 @@ class LivePortalInspector:
             result = {
                 'inspection_id': self.inspection_id,
                 'success': True,
-                'events_count': len(self.events),
+                'events_count': self.events_count,
                 'analysis': analysis,
                 'adapter_path': adapter_path,
-                'logs_path': str(self.config.output_dir / "logs" / f"{self.inspection_id}.ndjson")
+                'logs_path': str(self.log_path)
             }
             
             # Emit stop event
@@ -461,17 +995,26 @@ class LivePortalInspector:
     
     async def _setup_network_interception(self) -> None:
         """Setup network request/response interception."""
+        capture_types = self.config.capture_resource_types
+        url_filter = re.compile(self.config.capture_url_pattern) if self.config.capture_url_pattern else None
+        
+        def should_capture(request) -> bool:
+            # Skip images, fonts, stylesheets etc. before any event is allocated
+            if request.resource_type not in capture_types:
+                return False
+            return url_filter is None or url_filter.search(request.url) is not None
         
         async def handle_request(request):
-            if not self.is_recording:
+            if not self.is_recording or not should_capture(request):
                 return
                 
             # Record request
+            request_url = self._intern_string(request.url)
             event = NetworkEvent(
-                page_url=request.url,
-                request_url=request.url,
+                page_url=request_url,
+                request_url=request_url,
                 method=request.method,
-                request_headers=dict(request.headers),
+                request_headers=self._intern_headers(request.headers),
                 request_body=request.post_data
             )
             
@@ -479,10 +1022,12 @@ class LivePortalInspector:
             event.request_body = self.phi_redactor.redact_text(event.request_body or "")
             event.request_headers = self.phi_redactor.redact_dict(event.request_headers)
             
-            await self._record_event(event)
+            # Logged once its response arrives (or at stop if it never does)
+            self._pending_requests[request_url].append(event)
+            await self._record_event(event, persist=False)
         
         async def handle_response(response):
-            if not self.is_recording:
+            if not self.is_recording or not should_capture(response.request):
                 return
                 
             try:
@@ -495,53 +1040,93 @@ class LivePortalInspector:
                         body = "[Binary Content]"
                 
                 # Find corresponding request event
-                for event in reversed(self.events):
-                    if (isinstance(event, NetworkEvent) and 
-                        event.request_url == response.url and 
-                        event.status_code is None):
-                        
-                        # Update with response data
-                        event.status_code = response.status
-                        event.response_headers = dict(response.headers)
-                        event.response_body = self.phi_redactor.redact_text(body)
-                        event.duration_ms = (datetime.now(timezone.utc) - event.timestamp).total_seconds() * 1000
-                        
-                        # Track API endpoints
-                        if response.url.endswith(('.json', '/api/', '/graphql')):
-                            self.api_endpoints.add(response.url)
-                        
-                        break
-                        
+                pending = self._pending_requests.get(response.url)
+                if pending:
+                    event = pending.pop()
+                    if not pending:
+                        del self._pending_requests[response.url]
+                    
+                    # Update with response data
+                    event.status_code = response.status
+                    event.response_headers = self._intern_headers(response.headers)
+                    redacted_body = self.phi_redactor.redact_text(body)
+                    event.response_body = redacted_body
+                    event.duration_ms = (datetime.now(timezone.utc) - event.timestamp).total_seconds() * 1000
+                    
+                    # Track API endpoints, remembering which page loaded them
+                    if self._is_api_response(response):
+                        self.api_endpoints.add(response.url)
+                        self.page_api_responses[self.page.url].append((response.url, redacted_body))
+                    
+                    self._write_log_event(event)
+                    
             except Exception as e:
                 logger.warning(f"Response handling error: {e}")
         
         self.context.on('request', handle_request)
         self.context.on('response', handle_response)
     
+    @staticmethod
+    def _match_table_endpoint(table: Dict[str, Any], responses) -> Optional[str]:
+        """Newest API response whose body holds the table's data, if any.
+
+        Sampled cell texts must all appear in the body; tables without usable
+        sample text fall back to an array in the body with one item per data row.
+        """
+        cells = [
+            cell for row in table.get('sampleData', []) for cell in row
+            if len(cell) >= 2
+        ][:6]
+        row_count = table.get('dataRowCount', 0)
+        
+        for url, body in reversed(responses):
+            if not body:
+                continue
+            if cells:
+                if all(cell in body for cell in cells):
+                    return url
+            elif row_count and row_count in _json_array_lengths(body):
+                return url
+        return None
+    
+    @staticmethod
+    def _is_api_response(response) -> bool:
+        """Whether a response looks like JSON data from a portal API."""
+        if response.url.endswith(('.json', '/api/', '/graphql')):
+            return True
+        return (
+            response.request.resource_type in ('xhr', 'fetch') and
+            'json' in response.headers.get('content-type', '')
+        )
+    
+    async def _route_request(self, route) -> None:
+        """Abort heavy asset requests and let everything else through."""
+        if route.request.resource_type in BLOCKED_RESOURCE_TYPES:
+            await route.abort()
+        else:
+            await route.continue_()
+    
+    def _intern_string(self, value: str) -> str:
+        """Return a shared instance of a frequently repeated string."""
+        pooled = self._string_pool.get(value)
+        if pooled is not None:
+            return pooled
+        
+        if len(self._string_pool) >= STRING_POOL_MAX_SIZE:
+            # Evict the oldest entry to keep the pool bounded
+            del self._string_pool[next(iter(self._string_pool))]
+        self._string_pool[value] = value
+        return value
+    
+    def _intern_headers(self, headers: Dict[str, str]) -> Dict[str, str]:
+        """Copy headers, sharing key and value strings across events."""
+        return {sys.intern(k): self._intern_string(v) for k, v in headers.items()}
+    
     async def _setup_event_listeners(self) -> None:
         """Setup DOM event listeners."""
         
-        # Inject click tracking
-        await self.page.add_init_script("""
-            document.addEventListener('click', (event) => {
-                const clickId = 'click_' + Date.now() + '_' + Math.random();
-                event.target.setAttribute('data-click-id', clickId);
-                
-                console.log('CLICK_EVENT:' + JSON.stringify({
-                    clickId: clickId,
-                    tagName: event.target.tagName,
-                    id: event.target.id,
-                    classes: Array.from(event.target.classList),
-                    attributes: Object.fromEntries(
-                        Array.from(event.target.attributes).map(attr => [attr.name, attr.value])
-                    ),
-                    textContent: event.target.textContent,
-                    coordinates: { x: event.clientX, y: event.clientY }
-                }));
-            }, true);
-        """)
-        
-        # Listen for console messages
+        # Click tracking itself is installed context-wide via INSPECTOR_INIT_JS;
+        # listen for the console messages it emits
         self.page.on('console', lambda msg: asyncio.create_task(self._handle_console_message(msg)))
     
     async def _handle_console_message(self, msg) -> None:
@@ -562,9 +1147,10 @@ class LivePortalInspector:
             if element:
                 selector = await self.selector_generator.generate_selector(self.page, element)
                 
-                # Check for popup triggers immediately after click
-                await asyncio.sleep(0.1)  # Brief wait for potential popup
-                await self._check_for_popups(selector)
+                # Popups are reported by the in-page observer; poll only as a fallback
+                self.last_click_selector = selector
+                if not self.popup_observer_active:
+                    await self._check_for_popups(selector)
                 
                 click_event = ClickEvent(
                     page_url=self.page.url,
@@ -627,66 +1213,58 @@ class LivePortalInspector:
     async def _check_for_popups(self, trigger_selector: str) -> None:
         """Check for popup dialogs after element interaction."""
         try:
-            # Common popup selectors
-            popup_selectors = [
-                '[role="dialog"]',
-                '.modal',
-                '.popup',
-                '.overlay',
-                '[data-modal]',
-                '.dialog'
-            ]
-            
-            for selector in popup_selectors:
-                elements = await self.page.query_selector_all(selector)
-                for element in elements:
-                    is_visible = await element.is_visible()
-                    if is_visible:
-                        await self._record_popup_event(element, trigger_selector)
-                        break
-                        
+            # Resolves as soon as any popup is visible instead of after a fixed delay
+            element = await self.page.wait_for_selector(
+                VISIBLE_POPUP_SELECTOR, state='visible', timeout=POPUP_WAIT_TIMEOUT_MS
+            )
+            if element:
+                await self._record_popup_event(element, trigger_selector)
+                
+        except PlaywrightTimeoutError:
+            pass
         except Exception as e:
             logger.warning(f"Popup detection error: {e}")
     
-    async def _record_popup_event(self, popup_element, trigger_selector: str) -> None:
+    async def _handle_popup_binding(self, source, popup_element) -> None:
+        """Handle a popup reported by the in-page MutationObserver."""
+        if not self.is_recording:
+            return
+        await self._record_popup_event(popup_element, self.last_click_selector)
+    
+    async def _record_popup_event(self, popup_element, trigger_selector: Optional[str]) -> None:
         """Record detailed popup event."""
         try:
             popup_selector = await self.selector_generator.generate_selector(self.page, popup_element)
-            inner_text = await popup_element.inner_text()
             
-            # Extract form fields
-            form_fields = []
-            form_elements = await popup_element.query_selector_all('input, select, textarea')
-            for field in form_elements:
-                field_data = await self.page.evaluate('''
-                    element => ({
+            # Extract text, form fields, buttons and links in a single round-trip
+            popup_data = await popup_element.evaluate('''
+                root => ({
+                    innerText: root.innerText,
+                    fields: Array.from(root.querySelectorAll('input, select, textarea')).map(element => ({
                         name: element.name,
                         type: element.type,
                         placeholder: element.placeholder,
                         value: element.value,
                         label: element.labels?.[0]?.textContent || ''
-                    })
-                ''', field)
-                form_fields.append(field_data)
-            
-            # Extract buttons
-            buttons = []
-            button_elements = await popup_element.query_selector_all('button, input[type="submit"], input[type="button"]')
-            for button in button_elements:
-                button_text = await button.inner_text()
-                buttons.append({'text': button_text, 'type': await button.get_attribute('type') or 'button'})
-            
-            # Extract links
-            links = []
-            link_elements = await popup_element.query_selector_all('a')
-            for link in link_elements:
-                link_text = await link.inner_text()
-                link_href = await link.get_attribute('href')
-                links.append({'text': link_text, 'href': link_href})
+                    })),
+                    buttons: Array.from(root.querySelectorAll('button, input[type="submit"], input[type="button"]')).map(button => ({
+                        text: button.innerText,
+                        type: button.getAttribute('type') || 'button'
+                    })),
+                    links: Array.from(root.querySelectorAll('a')).map(link => ({
+                        text: link.innerText,
+                        href: link.getAttribute('href') || ''
+                    }))
+                })
+            ''')
+            inner_text = popup_data.get('innerText') or ''
+            form_fields = popup_data.get('fields', [])
+            buttons = popup_data.get('buttons', [])
+            links = popup_data.get('links', [])
             
-            # Take screenshot
+            # Take screenshot of the dialog only
             screenshot_path = await self.screenshot_manager.capture_screenshot(
-                self.page, self.inspection_id, "popup"
+                self.page, self.inspection_id, "popup", element_handle=popup_element
             )
             
             popup_event = PopupEvent(
@@ -754,70 +1332,37 @@ class LivePortalInspector:
     async def _analyze_page_structure(self) -> None:
         """Analyze current page structure for forms and tables."""
         try:
-            # Analyze forms
-            forms = await self.page.query_selector_all('form')
-            for form in forms:
-                form_data = await self.page.evaluate('''
-                    form => {
-                        const fields = Array.from(form.querySelectorAll('input, select, textarea')).map(field => ({
-                            name: field.name,
-                            type: field.type,
-                            placeholder: field.placeholder,
-                            label: field.labels?.[0]?.textContent || '',
-                            required: field.required
-                        }));
-                        
-                        return {
-                            action: form.action,
-                            method: form.method,
-                            fields: fields
-                        };
-                    }
-                ''', form)
-                
-                form_selector = await self.selector_generator.generate_selector(self.page, form)
-                form_data['selector'] = form_selector
-                self.forms_discovered.append(form_data)
+            # Snapshot all forms and tables (with selectors) in a single round-trip
+            structure = await self.page.evaluate(PAGE_STRUCTURE_JS)
+            
+            # Link a table to a JSON API only when the response holds its data, so
+            # replay adapters fetch it instead of scraping cells; others scrape the DOM
+            page_responses = self.page_api_responses.get(self.page.url, ())
+            for table in structure['tables']:
+                table['api_endpoint'] = self._match_table_endpoint(table, page_responses)
+            
+            self.forms_discovered.extend(structure['forms'])
+            self.tables_discovered.extend(structure['tables'])
             
-            # Analyze tables
-            tables = await self.page.query_selector_all('table')
-            for table in tables:
-                table_data = await self.page.evaluate('''
-                    table => {
-                        const headers = Array.from(table.querySelectorAll('th')).map(th => th.textContent.trim());
-                        const rows = table.querySelectorAll('tbody tr, tr');
-                        const sampleData = Array.from(rows).slice(0, 3).map(row => 
-                            Array.from(row.querySelectorAll('td')).map(td => td.textContent.trim())
-                        );
-                        
-                        return {
-                            headers: headers,
-                            rowCount: rows.length,
-                            sampleData: sampleData
-                        };
-                    }
-                ''', table)
-                
-                table_selector = await self.selector_generator.generate_selector(self.page, table)
-                table_data['selector'] = table_selector
-                self.tables_discovered.append(table_data)
-                
         except Exception as e:
             logger.error(f"Page structure analysis error: {e}")
     
-    async def _record_event(self, event: EventModel) -> None:
+    async def _record_event(self, event: EventModel, persist: bool = True) -> None:
         """Record event with validation and streaming."""
         try:
-            # Validate event
+            # Validate event; the dict is shared by the log writer and SocketIO
             event_dict = event.dict()
             
-            # Add to events list
+            # Keep a bounded window in memory and stream the event to disk
             self.events.append(event)
+            self.events_count += 1
+            self.event_type_counts[event.event_tag] += 1
+            if persist:
+                self._write_log_event(event, event_dict)
             
-            # Stream to SocketIO
-            if self.socketio:
-                self.socketio.emit('live_inspection_update', {
-                    'inspection_id': self.inspection_id,
+            # Queue for the SocketIO emit loop
+            if self._emit_queue is not None:
+                self._emit_queue.put_nowait({
                     'event': event_dict,
                     'timestamp': event.timestamp.isoformat()
                 })
@@ -827,242 +1372,231 @@ class LivePortalInspector:
         except Exception as e:
             logger.error(f"Event recording error: {e}")
     
+    async def _emit_loop(self) -> None:
+        """Drain queued live updates and emit them to SocketIO in batches."""
+        loop = asyncio.get_running_loop()
+        stopping = False
+        while not stopping:
+            payload = await self._emit_queue.get()
+            if payload is None:
+                break
+            batch = [payload]
+            deadline = loop.time() + EMIT_BATCH_INTERVAL
+            while len(batch) < EMIT_BATCH_SIZE:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    payload = await asyncio.wait_for(self._emit_queue.get(), remaining)
+                except asyncio.TimeoutError:
+                    break
+                if payload is None:
+                    stopping = True
+                    break
+                batch.append(payload)
+            await self._emit_batch(batch)
+    
+    async def _emit_batch(self, batch: List[Dict[str, Any]]) -> None:
+        """Emit one batch of live updates without blocking the event loop."""
+        try:
+            # Slow clients stall emit; keep that off the Playwright event loop
+            await asyncio.to_thread(self.socketio.emit, 'live_inspection_update_batch', {
+                'inspection_id': self.inspection_id,
+                'events': batch
+            })
+        except Exception as e:
+            logger.error(f"Live update emit error: {e}")
+    
+    async def _stop_emit_loop(self) -> None:
+        """Emit whatever is still queued and stop the emit loop."""
+        if self._emit_task is None:
+            return
+        # None marks the end of the queue; everything before it is still delivered
+        self._emit_queue.put_nowait(None)
+        await self._emit_task
+        self._emit_task = None
+        self._emit_queue = None
+    
     async def _perform_comprehensive_analysis(self) -> Dict[str, Any]:
         """Perform comprehensive analysis of recorded events."""
+        # Snapshot on the event loop, then classify in a worker thread so
+        # late events keep being recorded while the analysis runs
+        return await asyncio.to_thread(
+            self._perform_comprehensive_analysis_sync,
+            list(self.event_type_counts),
+            self.events_count,
+            list(self.forms_discovered),
+            list(self.tables_discovered),
+            list(self.navigation_flow),
+            list(self.api_endpoints),
+            list(self.popup_dialogs)
+        )
+    
+    def _perform_comprehensive_analysis_sync(
+        self,
+        counts: List[int],
+        events_count: int,
+        forms: List[Dict[str, Any]],
+        tables: List[Dict[str, Any]],
+        navigation_flow: List[str],
+        api_endpoints: List[str],
+        popup_dialogs: List[Dict[str, Any]]
+    ) -> Dict[str, Any]:
+        """Build the analysis from snapshots of the inspection state."""
+        # Per-type counts are maintained incrementally by _record_event
         analysis = {
             'summary': {
-                'total_events': len(self.events),
-                'navigation_count': len([e for e in self.events if isinstance(e, NavigationEvent)]),
-                'click_count': len([e for e in self.events if isinstance(e, ClickEvent)]),
-                'input_count': len([e for e in self.events if isinstance(e, InputEvent)]),
-                'network_count': len([e for e in self.events if isinstance(e, NetworkEvent)]),
-                'popup_count': len([e for e in self.events if isinstance(e, PopupEvent)])
+                'total_events': events_count,
+                'navigation_count': counts[NAVIGATION_TAG],
+                'click_count': counts[CLICK_TAG],
+                'input_count': counts[INPUT_TAG],
+                'network_count': counts[NETWORK_TAG],
+                'popup_count': counts[POPUP_TAG]
             },
-            'forms': self.forms_discovered,
-            'tables': self.tables_discovered,
-            'navigation_flow': self.navigation_flow,
-            'api_endpoints': list(self.api_endpoints),
-            'popup_dialogs': self.popup_dialogs,
-            'demographic_fields': self._identify_demographic_fields(),
-            'medical_sections': self._classify_medical_sections()
+            'forms': forms,
+            'tables': tables,
+            'navigation_flow': navigation_flow,
+            'api_endpoints': api_endpoints,
+            'popup_dialogs': popup_dialogs,
+            'demographic_fields': self._identify_demographic_fields(forms),
+            'medical_sections': self._classify_medical_sections(navigation_flow)
         }
         
         return analysis
     
-    def _identify_demographic_fields(self) -> List[Dict[str, Any]]:
+    def _identify_demographic_fields(self, forms: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         """Identify demographic fields from forms."""
-        demographic_keywords = {
-            'name': ['name', 'first_name', 'last_name', 'full_name'],
-            'dob': ['dob', 'date_of_birth', 'birthdate', 'birth_date'],
-            'ssn': ['ssn', 'social_security', 'social_security_number'],
-            'address': ['address', 'street', 'city', 'state', 'zip', 'postal'],
-            'phone': ['phone', 'telephone', 'mobile', 'cell'],
-            'email': ['email', 'e_mail', 'mail'],
-            'gender': ['gender', 'sex'],
-            'race': ['race', 'ethnicity', 'ethnic'],
-            'insurance': ['insurance', 'provider', 'policy', 'subscriber']
-        }
-        
         demographic_fields = []
         
-        for form in self.forms_discovered:
+        for form in forms:
             for field in form.get('fields', []):
                 field_name = (field.get('name', '') + ' ' + field.get('label', '')).lower()
                 
-                for category, keywords in demographic_keywords.items():
-                    if any(keyword in field_name for keyword in keywords):
-                        demographic_fields.append({
-                            'category': category,
-                            'field_name': field.get('name'),
-                            'label': field.get('label'),
-                            'form_selector': form.get('selector'),
-                            'type': field.get('type')
-                        })
-                        break
+                category = DEMOGRAPHIC_CLASSIFIER.classify(field_name)
+                if category:
+                    demographic_fields.append({
+                        'category': category,
+                        'field_name': field.get('name'),
+                        'label': field.get('label'),
+                        'form_selector': form.get('selector'),
+                        'type': field.get('type')
+                    })
         
         return demographic_fields
     
-    def _classify_medical_sections(self) -> Dict[str, List[str]]:
+    def _classify_medical_sections(self, navigation_flow: List[str]) -> Dict[str, List[str]]:
         """Classify pages/sections by medical content."""
-        medical_keywords = {
-            'demographics': ['patient', 'personal', 'contact', 'emergency'],
-            'medications': ['medication', 'drugs', 'prescriptions', 'pharmacy'],
-            'labs': ['lab', 'laboratory', 'test', 'results', 'blood', 'urine'],
-            'vitals': ['vital', 'blood_pressure', 'temperature', 'weight', 'height'],
-            'allergies': ['allergy', 'allergies', 'adverse', 'reaction'],
-            'appointments': ['appointment', 'schedule', 'visit', 'calendar'],
-            'procedures': ['procedure', 'surgery', 'operation', 'treatment'],
-            'history': ['history', 'medical_history', 'past', 'previous'],
-            'insurance': ['insurance', 'billing', 'payment', 'coverage']
-        }
+        # Pages are revisited often; classify each distinct URL once, in first-visit order
+        unique_urls = dict.fromkeys(navigation_flow)
+        classified_sections: Dict[str, List[str]] = {}
         
-        classified_sections = defaultdict(list)
+        for url in unique_urls:
+            category = MEDICAL_SECTION_CLASSIFIER.classify(url.lower())
+            if category:
+                classified_sections.setdefault(category, []).append(url)
         
-        for url in self.navigation_flow:
-            url_lower = url.lower()
-            for category, keywords in medical_keywords.items():
-                if any(keyword in url_lower for keyword in keywords):
-                    classified_sections[category].append(url)
-                    break
-        
-        return dict(classified_sections)
+        return classified_sections
     
-    async def _save_inspection_logs(self) -> None:
-        """Save inspection logs to NDJSON format."""
+    def _open_inspection_log(self) -> None:
+        """Open the gzip-compressed NDJSON log for the current inspection."""
         logs_dir = self.config.output_dir / "logs"
         logs_dir.mkdir(parents=True, exist_ok=True)
         
-        log_file = logs_dir / f"{self.inspection_id}.ndjson"
+        if self.cipher:
+            # Chunks are compressed before encryption (see _seal_log_chunk)
+            self.log_path = logs_dir / f"{self.inspection_id}.ndjson.gz.enc"
+            self._log_file = open(self.log_path, 'wb', buffering=LOG_WRITE_BUFFER_SIZE)
+        else:
+            self.log_path = logs_dir / f"{self.inspection_id}.ndjson.gz"
+            self._log_file = gzip.open(self.log_path, 'wb', compresslevel=LOG_COMPRESS_LEVEL)
+        self._log_buffer = []
+        self._log_buffered = 0
+        self._pending_requests.clear()
+    
+    def _write_log_event(self, event: EventModel, event_dict: Optional[Dict[str, Any]] = None) -> None:
+        """Buffer an event for the NDJSON log, flushing in ~1 MB chunks."""
+        if self._log_file is None:
+            return
         
         try:
-            with open(log_file, 'w') as f:
-                for event in self.events:
-                    event_json = json.dumps(event.dict(), default=str)
-                    
-                    # Encrypt if cipher available
-                    if self.cipher:
-                        event_json = self.cipher.encrypt(event_json.encode()).decode()
-                    
-                    f.write(event_json + '\n')
-            
-            logger.info(f"Logs saved to {log_file}")
-            
+            line = self._encode_event(event, event_dict)
+            self._log_buffer.append(line)
+            self._log_buffered += len(line)
+            if self._log_buffered >= LOG_WRITE_BUFFER_SIZE:
+                self._flush_log_buffer()
         except Exception as e:
-            logger.error(f"Failed to save logs: {e}")
-    
-    async def _generate_replay_adapter(self) -> str:
-        """Generate replay adapter script using Jinja2."""
-        template_str = '''#!/usr/bin/env python3
-"""
-Auto-generated Portal Replay Adapter
-Generated from inspection: {{ inspection_id }}
-Portal: {{ portal_name }}
-Date: {{ generation_date }}
-"""
-
-import asyncio
-import json
-from pathlib import Path
-from playwright.async_api import async_playwright
-
-CREDENTIALS = {
-    'username': 'YOUR_USERNAME_HERE',
-    'password': 'YOUR_PASSWORD_HERE'
-}
-
-class PortalAdapter:
-    """{{ portal_name }} Portal Adapter"""
+            logger.error(f"Failed to write log event: {e}")
     
-    def __init__(self):
-        self.browser = None
-        self.context = None
-        self.page = None
-    
-    async def start_browser(self):
-        """Initialize browser and context."""
-        playwright = await async_playwright().start()
-        self.browser = await playwright.chromium.launch(headless=False)
-        self.context = await self.browser.new_context(
-            viewport={'width': 1920, 'height': 1080}
-        )
-        self.page = await self.context.new_page()
+    def _flush_log_buffer(self) -> None:
+        """Write buffered NDJSON lines to the log file."""
+        if self._log_buffer and self._log_file is not None:
+            self._log_file.write(self._seal_log_chunk(self._log_buffer))
+        self._log_buffer = []
+        self._log_buffered = 0
     
-    async def login(self):
-        """Perform login sequence."""
-        await self.page.goto('{{ portal_url }}')
-        await self.page.wait_for_load_state('networkidle')
-        
-        {% for form in forms %}
-        {% if 'login' in form.action.lower() or 'signin' in form.action.lower() %}
-        # Login form found: {{ form.selector }}
-        {% for field in form.fields %}
-        {% if 'username' in field.name.lower() or 'email' in field.name.lower() %}
-        await self.page.fill('{{ form.selector }} input[name="{{ field.name }}"]', CREDENTIALS['username'])
-        {% elif 'password' in field.name.lower() %}
-        await self.page.fill('{{ form.selector }} input[name="{{ field.name }}"]', CREDENTIALS['password'])
-        {% endif %}
-        {% endfor %}
+    async def _save_inspection_logs(self) -> None:
+        """Flush remaining events and close the NDJSON log."""
+        if self._log_file is None:
+            return
         
-        await self.page.click('{{ form.selector }} input[type="submit"], {{ form.selector }} button[type="submit"]')
-        await self.page.wait_for_load_state('networkidle')
-        {% endif %}
-        {% endfor %}
-    
-    async def extract_table_data(self):
-        """Extract data from discovered tables."""
-        {% for table in tables %}
-        try:
-            table_element = await self.page.query_selector('{{ table.selector }}')
-            if table_element:
-                headers = {{ table.headers | tojson }}
-                rows = await self.page.query_selector_all('{{ table.selector }} tbody tr, {{ table.selector }} tr')
-                table_data = []
-                
-                for row in rows:
-                    cells = await row.query_selector_all('td')
-                    row_data = []
-                    for cell in cells:
-                        cell_text = await cell.inner_text()
-                        row_data.append(cell_text.strip())
-                    if row_data:
-                        table_data.append(row_data)
-                
-                print(f"Extracted table data: {len(table_data)} rows")
-                
-        except Exception as e:
-            print(f"Table extraction error: {e}")
-        {% endfor %}
-    
-    async def run_full_sequence(self):
-        """Run complete portal interaction sequence."""
         try:
-            await self.start_browser()
-            print("Browser started")
-            await self.login()
-            print("Login completed")
-            await self.extract_table_data()
-            print("Data extraction completed")
+            # Requests that never received a response are logged as-is
+            for pending in self._pending_requests.values():
+                for event in pending:
+                    self._write_log_event(event)
+            self._pending_requests.clear()
+            
+            self._flush_log_buffer()
+            self._log_file.close()
+            self._log_file = None
+            
+            logger.info(f"Logs saved to {self.log_path}")
             
         except Exception as e:
-            print(f"Adapter execution error: {e}")
-        
-        finally:
-            if self.browser:
-                await self.browser.close()
-
-async def main():
-    """Main execution function."""
-    adapter = PortalAdapter()
-    await adapter.run_full_sequence()
-
-if __name__ == "__main__":
-    asyncio.run(main())
-'''
+            logger.error(f"Failed to save logs: {e}")
+    
+    def _encode_event(self, event: EventModel, event_dict: Optional[Dict[str, Any]] = None) -> bytes:
+        """Serialize a single event as an NDJSON line, reusing event_dict if given."""
+        if event_dict is None:
+            event_dict = event.dict()
+        return dumps_json(event_dict) + b'\n'
+    
+    def _seal_log_chunk(self, lines: List[bytes]) -> bytes:
+        """Join NDJSON lines, compressing and encrypting the chunk as one token if configured."""
+        chunk = b''.join(lines)
         
-        # Render template
-        if DEPENDENCIES_AVAILABLE:
-            template = jinja2.Template(template_str)
-            adapter_content = template.render(
-                inspection_id=self.inspection_id,
-                portal_name=self.config.portal_name,
-                portal_url=self.config.portal_url,
-                generation_date=datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
-                forms=self.forms_discovered,
-                tables=self.tables_discovered,
-                navigation_flow=self.navigation_flow,
-                api_endpoints=list(self.api_endpoints),
-                popup_dialogs=self.popup_dialogs
-            )
-        else:
-            adapter_content = f"# Adapter generation skipped due to missing jinja2 dependency\n# Inspection ID: {self.inspection_id}"
+        # Encrypt if cipher available; one token per chunk amortizes cipher setup.
+        # Compress first: ciphertext doesn't compress. Each token decrypts to a gzip
+        # member, so the decrypted tokens concatenate into one valid gzip stream.
+        if self.cipher:
+            return self.cipher.encrypt(gzip.compress(chunk, compresslevel=LOG_COMPRESS_LEVEL)) + b'\n'
         
+        # Plain logs are compressed by the gzip file itself
+        return chunk
+    
+    async def _generate_replay_adapter(self) -> str:
+        """Generate replay adapter script using Jinja2."""
         # Save adapter file
         adapter_dir = self.config.output_dir / "adapters"
         adapter_dir.mkdir(parents=True, exist_ok=True)
         adapter_path = adapter_dir / f"adapter_{self.inspection_id}.py"
         
         with open(adapter_path, 'w') as f:
-            f.write(adapter_content)
+            if DEPENDENCIES_AVAILABLE:
+                # Stream the rendered chunks straight to disk
+                f.writelines(REPLAY_ADAPTER_JINJA.generate(
+                    inspection_id=self.inspection_id,
+                    portal_name=self.config.portal_name,
+                    portal_url=self.config.portal_url,
+                    generation_date=datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+                    forms=self.forms_discovered,
+                    tables=self.tables_discovered,
+                    navigation_flow=self.navigation_flow,
+                    api_endpoints=list(self.api_endpoints),
+                    popup_dialogs=self.popup_dialogs
+                ))
+            else:
+                f.write(f"# Adapter generation skipped due to missing jinja2 dependency\n# Inspection ID: {self.inspection_id}")
         
         logger.info(f"Replay adapter generated: {adapter_path}")
         return str(adapter_path)
@@ -1076,22 +1610,35 @@ def create_inspector_blueprint() -> Blueprint:
         raise ImportError(f"Required dependencies not available: {import_error}")
     
     blueprint = Blueprint('inspector', __name__, url_prefix='/inspector')
-    inspector_instance = None
+    
+    # Running inspectors keyed by inspection_id so several sessions can run at once
+    inspectors: Dict[str, LivePortalInspector] = {}
+    
+    def status_payload(inspector: LivePortalInspector) -> Dict[str, Any]:
+        return {
+            'active': inspector.is_recording,
+            'inspection_id': inspector.inspection_id,
+            'events_count': inspector.events_count,
+            'portal_url': inspector.config.portal_url
+        }
     
     @blueprint.route('/start', methods=['POST'])
     async def start_inspection():
         """Start new inspection."""
-        nonlocal inspector_instance
-        
         try:
             config_data = request.get_json()
             config = InspectorConfig(**config_data)
             
+            # Drop inspectors that ended on their own (e.g. timeout)
+            for finished_id in [i for i, inspector in inspectors.items() if not inspector.is_recording]:
+                inspectors.pop(finished_id, None)
+            
             # Get SocketIO instance from app
             socketio = getattr(blueprint, 'socketio', None)
             
-            inspector_instance = LivePortalInspector(config, socketio)
-            inspection_id = await inspector_instance.start_inspection()
+            inspector = LivePortalInspector(config, socketio)
+            inspection_id = await inspector.start_inspection()
+            inspectors[inspection_id] = inspector
             
             return jsonify({
                 'success': True,
@@ -1108,18 +1655,26 @@ def create_inspector_blueprint() -> Blueprint:
     
     @blueprint.route('/stop', methods=['POST'])
     async def stop_inspection():
-        """Stop current inspection."""
-        nonlocal inspector_instance
-        
+        """Stop an inspection by id (or the only running one if no id is given)."""
         try:
-            if not inspector_instance:
+            inspection_id = (request.get_json(silent=True) or {}).get('inspection_id')
+            if inspection_id:
+                inspector = inspectors.pop(inspection_id, None)
+                if not inspector:
+                    return jsonify({
+                        'success': False,
+                        'error': 'Unknown inspection_id'
+                    }), 404
+            elif len(inspectors) == 1:
+                inspector = inspectors.pop(next(iter(inspectors)))
+            else:
                 return jsonify({
                     'success': False,
-                    'error': 'No inspection in progress'
+                    'error': 'No inspection in progress' if not inspectors
+                             else 'inspection_id is required when several inspections are running'
                 }), 400
             
-            result = await inspector_instance.stop_inspection()
-            inspector_instance = None
+            result = await inspector.stop_inspection()
             
             return jsonify({
                 'success': True,
@@ -1135,22 +1690,32 @@ def create_inspector_blueprint() -> Blueprint:
     
     @blueprint.route('/status', methods=['GET'])
     def get_status():
-        """Get inspection status."""
-        nonlocal inspector_instance
+        """Get status of all running inspections."""
+        running = [status_payload(inspector) for inspector in inspectors.values() if inspector.is_recording]
         
-        if inspector_instance and inspector_instance.is_recording:
-            return jsonify({
-                'active': True,
-                'inspection_id': inspector_instance.inspection_id,
-                'events_count': len(inspector_instance.events),
-                'portal_url': inspector_instance.config.portal_url
-            })
+        if running:
+            # Top-level fields describe the most recent inspection for older clients
+            return jsonify({**running[-1], 'inspections': running})
         else:
             return jsonify({
                 'active': False,
-                'inspection_id': None
+                'inspection_id': None,
+                'inspections': []
             })
     
+    @blueprint.route('/status/<inspection_id>', methods=['GET'])
+    def get_inspection_status(inspection_id: str):
+        """Get status of one inspection."""
+        inspector = inspectors.get(inspection_id)
+        if not inspector:
+            return jsonify({
+                'active': False,
+                'inspection_id': inspection_id,
+                'error': 'Inspection not found'
+            }), 404
+        
+        return jsonify(status_payload(inspector))
+    
     @blueprint.route('/export/<inspection_id>', methods=['GET'])
     def export_inspection(inspection_id: str):
         """Export inspection data."""
@@ -1186,6 +1751,12 @@ def create_cli_parser() -> argparse.ArgumentParser:
     parser.add_argument('--timeout-minutes', type=int, default=30, help='Timeout in minutes')
     parser.add_argument('--headless', action='store_true', help='Run browser in headless mode')
     parser.add_argument('--encryption-key', help='Encryption key for logs')
+    parser.add_argument('--screenshot-format', choices=['png', 'jpeg'],
+                       default='jpeg', help='Screenshot image format')
+    parser.add_argument('--full-page-screenshots', action='store_true',
+                       help='Capture the full scrollable page instead of the viewport')
+    parser.add_argument('--block-assets', action='store_true',
+                       help='Abort image, font and media requests during inspection')
     
     return parser
 
@@ -1203,7 +1774,10 @@ async def main_cli():
         output_dir=args.output_dir,
         timeout_minutes=args.timeout_minutes,
         headless=args.headless,
-        encryption_key=args.encryption_key
+        encryption_key=args.encryption_key,
+        screenshot_format=args.screenshot_format,
+        screenshot_full_page=args.full_page_screenshots,
+        block_heavy_resources=args.block_assets
     )
     
     # Create inspector
@@ -1214,8 +1788,9 @@ async def main_cli():
         inspection_id = await inspector.start_inspection()
         print(f"Inspection started: {inspection_id}")
         
-        # Wait for user input to stop
-        input("Press Enter to stop inspection...")
+        # Wait for user input to stop; read on a thread so the event loop keeps
+        # serving Playwright callbacks meanwhile
+        await asyncio.to_thread(input, "Press Enter to stop inspection...")
         
         result = await inspector.stop_inspection()
         print(f"Inspection completed: {result}")
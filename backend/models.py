@@ -1,7 +1,13 @@
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import event, inspect
 from datetime import datetime
 import json
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 db = SQLAlchemy()
 
 class PortalAdapter(db.Model):
@@ -13,24 +19,37 @@ class PortalAdapter(db.Model):
     script_filename = db.Column(db.String(200), unique=True, nullable=False)
     is_active = db.Column(db.Boolean, default=True, nullable=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    # Stamped in UTC by the column default and onupdate; callers never set it themselves
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
     
     # Relationship
     extraction_jobs = db.relationship('ExtractionJob', backref='adapter', lazy=True)
     
     def to_dict(self):
-        return {
-            'id': self.id,
-            'name': self.name,
-            'description': self.description,
-            'script_filename': self.script_filename,
-            'is_active': self.is_active,
-            'created_at': self.created_at.isoformat(),
-            'updated_at': self.updated_at.isoformat()
-        }
+        # Serialized once per loaded version of this instance; the listeners below
+        # drop it on writes and reloads, and unflushed edits are never cached
+        cached = self.__dict__.get('_dict_cache')
+        modified = inspect(self).modified
+        if cached is None or modified:
+            cached = {
+                'id': self.id,
+                'name': self.name,
+                'description': self.description,
+                'script_filename': self.script_filename,
+                'is_active': self.is_active,
+                'created_at': self.created_at.isoformat(),
+                'updated_at': self.updated_at.isoformat()
+            }
+            if not modified:
+                self.__dict__['_dict_cache'] = cached
+        return dict(cached)
 
 class ExtractionJob(db.Model):
     __tablename__ = 'extraction_jobs'
+    __table_args__ = (
+        # Serves job listings filtered by adapter/status and ordered by creation time
+        db.Index('ix_jobs_adapter_status_created', 'portal_adapter_id', 'status', 'created_at'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     job_name = db.Column(db.String(200), nullable=True)  # New field for custom job naming
@@ -48,19 +67,13 @@ class ExtractionJob(db.Model):
     status = db.Column(db.String(50), nullable=False, index=True, default='PENDING_LOGIN')
     # Status values: 'PENDING_LOGIN', 'LAUNCHING_BROWSER', 'AWAITING_USER_CONFIRMATION', 'EXTRACTING', 'COMPLETED', 'FAILED'
     error_message = db.Column(db.Text, nullable=True)
-    raw_extracted_data_json = db.Column(db.Text, nullable=True)
+    # Deferred: listings only load the payload when they undefer it
+    raw_extracted_data_json = db.deferred(db.Column(db.Text, nullable=True))
     created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
     
-    def to_dict(self, include_adapter_name=True):
-        """Optimized to_dict with optional adapter name loading"""
-        extracted_data = None
-        if self.raw_extracted_data_json:
-            try:
-                extracted_data = json.loads(self.raw_extracted_data_json)
-            except json.JSONDecodeError:
-                extracted_data = None
-        
+    def to_dict(self, include_adapter_name=True, include_extracted_data=True):
+        """Optimized to_dict with optional adapter name and extracted data loading"""
         result = {
             'id': self.id,
             'job_name': self.job_name,
@@ -75,14 +88,54 @@ class ExtractionJob(db.Model):
             'results_file_path': self.results_file_path,
             'status': self.status,
             'error_message': self.error_message,
-            'extracted_data': extracted_data,
-            'raw_extracted_data_json': self.raw_extracted_data_json,
+            'has_extracted_data': bool(self.has_extracted_data),
             'created_at': self.created_at.isoformat(),
             'updated_at': self.updated_at.isoformat()
         }
         
-        # Only include adapter_name if specifically requested to avoid N+1 queries
+        # Decoding extracted data can be MBs of work; skip it unless requested
+        if include_extracted_data:
+            result['extracted_data'] = self.decode_extracted_data()
+            result['raw_extracted_data_json'] = self.raw_extracted_data_json
+        
+        # adapter_name is loaded with the row, so this never touches the relationship
         if include_adapter_name:
-            result['adapter_name'] = self.adapter.name if self.adapter else None
+            result['adapter_name'] = self.adapter_name
             
-        return result 
\ No newline at end of file
+        return result
+    
+    def decode_extracted_data(self):
+        """Parse raw_extracted_data_json, returning None if absent or invalid"""
+        if not self.raw_extracted_data_json:
+            return None
+        try:
+            if orjson is not None:
+                return orjson.loads(self.raw_extracted_data_json)
+            return json.loads(self.raw_extracted_data_json)
+        except ValueError:
+            return None 
+
+@event.listens_for(PortalAdapter, 'after_insert')
+@event.listens_for(PortalAdapter, 'after_update')
+def _clear_adapter_dict_on_write(mapper, connection, target):
+    """Drop an adapter's cached to_dict once its row is written"""
+    target.__dict__.pop('_dict_cache', None)
+
+@event.listens_for(PortalAdapter, 'expire')
+@event.listens_for(PortalAdapter, 'refresh')
+def _clear_adapter_dict_on_reload(target, *args):
+    """Drop an adapter's cached to_dict when its attributes are expired or reloaded"""
+    target.__dict__.pop('_dict_cache', None)
+
+# Computed in SQL so listings can report it without fetching the deferred payload
+ExtractionJob.has_extracted_data = db.column_property(
+    db.func.coalesce(db.func.length(ExtractionJob.raw_extracted_data_json), 0) > 0
+)
+
+# Loaded as a correlated subquery with each job, so listings avoid one adapter SELECT per job
+ExtractionJob.adapter_name = db.column_property(
+    db.select(PortalAdapter.name)
+    .where(PortalAdapter.id == ExtractionJob.portal_adapter_id)
+    .correlate_except(PortalAdapter)
+    .scalar_subquery()
+)
@@ -18,18 +18,248 @@ Usage Examples:
 """
 
 import argparse
+import copy
 import sys
 import json
+import textwrap
+import threading
+import time
+import weakref
+from collections import OrderedDict, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from datetime import datetime
-from typing import Dict, List, Optional, Any
+from typing import Dict, Iterable, Iterator, List, Optional, Any, Tuple
 
 import mysql.connector
+from mysql.connector import errorcode, pooling
 from dotenv import load_dotenv
 import os
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 # Setup
 load_dotenv('.env', override=True)
 
+# Connections kept open per process; enough for the parallel section fetches
+POOL_SIZE = int(os.getenv('WEBAUTODASH_DB_POOL_SIZE', 8))
+
+# Seconds a list_patients result is reused before querying again
+PATIENT_LIST_CACHE_TTL = 60
+PATIENT_LIST_CACHE_SIZE = 64
+
+# Seconds a comprehensive patient record is reused for the same (database, PRN) and options
+PATIENT_CACHE_TTL = 30
+PATIENT_CACHE_SIZE = 256
+
+# Per-patient section queries: (SELECT list, FROM/WHERE filtered by PRN, ORDER BY,
+# accepts a date range). The source is kept separate so totals can be counted over it.
+# Clinical sections narrow patient_extractions by PRN in a derived table first, so
+# the joins start from that index range; date-range sections have no WHERE of their own.
+SECTION_QUERIES = {
+    'extractions': ("""
+            SELECT pe.*, es.job_name, es.portal_name, es.target_medication, 
+                   es.start_date, es.end_date, es.extracted_at""", """
+            FROM patient_extractions pe
+            JOIN extraction_sessions es ON pe.extraction_session_id = es.id
+            WHERE pe.prn = %s
+            """, "es.extracted_at DESC", False),
+    'medications': ("""
+            SELECT m.*, pe.extraction_session_id, es.target_medication as session_medication,
+                   es.start_date as session_start, es.end_date as session_end,
+                   es.extracted_at, es.job_name""", """
+            FROM (SELECT id, extraction_session_id FROM patient_extractions WHERE prn = %s) pe
+            JOIN medications m ON m.patient_extraction_id = pe.id
+            JOIN extraction_sessions es ON es.id = pe.extraction_session_id
+            """, "m.medication_type, m.created_at DESC", True),
+    'diagnoses': ("""
+            SELECT d.*, pe.extraction_session_id, es.start_date as session_start, 
+                   es.end_date as session_end, es.extracted_at, es.job_name""", """
+            FROM (SELECT id, extraction_session_id FROM patient_extractions WHERE prn = %s) pe
+            JOIN diagnoses d ON d.patient_extraction_id = pe.id
+            JOIN extraction_sessions es ON es.id = pe.extraction_session_id
+            """, "d.diagnosis_type, d.created_at DESC", True),
+    'allergies': ("""
+            SELECT a.*, pe.extraction_session_id, es.start_date as session_start,
+                   es.end_date as session_end, es.extracted_at, es.job_name""", """
+            FROM (SELECT id, extraction_session_id FROM patient_extractions WHERE prn = %s) pe
+            JOIN allergies a ON a.patient_extraction_id = pe.id
+            JOIN extraction_sessions es ON es.id = pe.extraction_session_id
+            """, "a.allergy_type, a.created_at DESC", True),
+    'health_concerns': ("""
+            SELECT hc.*, pe.extraction_session_id, es.start_date as session_start,
+                   es.end_date as session_end, es.extracted_at, es.job_name""", """
+            FROM (SELECT id, extraction_session_id FROM patient_extractions WHERE prn = %s) pe
+            JOIN health_concerns hc ON hc.patient_extraction_id = pe.id
+            JOIN extraction_sessions es ON es.id = pe.extraction_session_id
+            """, "hc.concern_type, hc.created_at DESC", True),
+    'conflicts': ("""
+            SELECT dc.*, p.patient_name""", """
+            FROM data_conflicts dc
+            JOIN patients p ON dc.patient_id = p.id
+            WHERE dc.prn = %s
+            """, "dc.detected_at DESC", False),
+    # Sessions referenced by the conflicts, stitched on in Python by attach_conflict_sessions
+    'conflict_sessions': ("""
+            SELECT id, job_name, extracted_at""", """
+            FROM extraction_sessions
+            WHERE id IN (
+                SELECT extraction_session_id_1 FROM data_conflicts WHERE prn = %s
+                UNION
+                SELECT extraction_session_id_2 FROM data_conflicts WHERE prn = %s
+            )
+            """, "id", False),
+}
+
+# Narrow SELECT lists with just the columns print_patient_summary uses; the full
+# SECTION_QUERIES lists (with large text columns) are kept for --json and API callers
+SUMMARY_SECTION_COLUMNS = {
+    'extractions': """
+            SELECT pe.id, pe.filter_medication_name, pe.filter_start_date, pe.filter_stop_date,
+                   es.job_name, es.portal_name, es.extracted_at""",
+    'medications': """
+            SELECT m.id, m.medication_type, m.medication_name, m.medication_strength, m.sig""",
+    'diagnoses': """
+            SELECT d.id, d.diagnosis_type, d.diagnosis_text, d.acuity""",
+    'allergies': """
+            SELECT a.id, a.allergy_type, a.allergy_name, a.reaction""",
+    'health_concerns': """
+            SELECT hc.id, hc.concern_text""",
+    'conflicts': """
+            SELECT dc.id, dc.prn, dc.conflict_type, dc.conflict_description, dc.severity, dc.status,
+                   dc.detected_at, dc.extraction_session_id_1, dc.extraction_session_id_2, p.patient_name""",
+}
+
+# Sections the CLI summary shows per type: (type column, types in display order, recency column)
+TYPED_SECTIONS = {
+    'medications': ('m.medication_type', ('active', 'current', 'historical'), 'm.created_at'),
+    'diagnoses': ('d.diagnosis_type', ('current', 'historical'), 'd.created_at'),
+}
+
+# Rows of each type the CLI summary prints for TYPED_SECTIONS
+SUMMARY_ROWS_PER_TYPE = 3
+
+# Rows the CLI summary prints from sections it shows as a plain "first N" slice
+SUMMARY_SECTION_LIMITS = {
+    'extractions': 5,
+    'allergies': 5,
+    'health_concerns': 3,
+}
+
+# Demographics by exact PRN; batched ahead of the sections when the PRN is known
+PATIENT_BY_PRN_QUERY = "SELECT * FROM patients WHERE prn = %s"
+
+# Partial name search narrowed by the ngram FULLTEXT index (ft_patient_name). The
+# ngram parser drops tokens containing stopwords, so the phrase can match names
+# without the term (the LIKE keeps the result identical to LIKE '%name%') or miss
+# names the term is in (the caller then falls back to PATIENT_BY_NAME_LIKE_QUERY)
+PATIENT_BY_NAME_QUERY = """
+            SELECT * FROM patients
+            WHERE MATCH(patient_name) AGAINST (%s IN BOOLEAN MODE)
+              AND patient_name LIKE %s
+            LIMIT 1
+"""
+PATIENT_BY_NAME_LIKE_QUERY = "SELECT * FROM patients WHERE patient_name LIKE %s LIMIT 1"
+
+# Shortest search term the ngram parser can index (server default ngram_token_size)
+NGRAM_TOKEN_SIZE = 2
+
+PROVIDER_CONFLICTS_QUERY = """
+            SELECT dc.*, p.patient_name
+            FROM data_conflicts dc
+            JOIN patients p ON dc.patient_id = p.id
+            ORDER BY dc.detected_at DESC
+            """
+
+PROVIDER_CONFLICT_SESSIONS_QUERY = """
+            SELECT id, job_name, extracted_at
+            FROM extraction_sessions
+            WHERE id IN (
+                SELECT extraction_session_id_1 FROM data_conflicts
+                UNION
+                SELECT extraction_session_id_2 FROM data_conflicts
+            )
+            """
+
+
+def apply_conflict_sessions(conflict: Dict, sessions_by_id: Dict[int, Dict]) -> Dict:
+    """Add session1/session2 name and time to one conflict row"""
+    for side in ('1', '2'):
+        session = sessions_by_id.get(conflict['extraction_session_id_' + side])
+        conflict['session' + side + '_name'] = session['job_name'] if session else None
+        conflict['session' + side + '_time'] = session['extracted_at'] if session else None
+    return conflict
+
+
+def attach_conflict_sessions(conflicts: List[Dict], sessions: List[Dict]) -> List[Dict]:
+    """Add session1/session2 name and time to conflict rows from a session lookup"""
+    by_id = {session['id']: session for session in sessions}
+    for conflict in conflicts:
+        apply_conflict_sessions(conflict, by_id)
+    return conflicts
+
+
+def dumps_json(data: Any) -> str:
+    """Serialize data as indented JSON, using orjson when it is installed"""
+    if orjson is not None:
+        # Datetimes go through default=str so the output matches the stdlib path
+        return orjson.dumps(
+            data, default=str,
+            option=orjson.OPT_INDENT_2 | orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+        ).decode()
+    return json.dumps(data, default=str, indent=2)
+
+
+def write_json_array(rows: Iterable[Dict], out=sys.stdout):
+    """Write rows as an indented JSON array as they arrive, like json.dumps(list(rows), indent=2)"""
+    out.write('[')
+    separator = '\n'
+    for row in rows:
+        out.write(separator)
+        out.write(textwrap.indent(dumps_json(row), '  '))
+        separator = ',\n'
+    out.write('\n]\n' if separator != '\n' else ']\n')
+
+
+class _TTLCache:
+    """Size-bounded cache whose entries are dropped once older than ttl seconds.
+
+    Values are deep-copied in and out, so callers can never modify a cached record.
+    """
+    
+    def __init__(self, ttl: float, maxsize: int):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._entries: OrderedDict = OrderedDict()  # key -> (stored_at, value), oldest first
+        self._lock = threading.Lock()
+    
+    def get(self, key) -> Any:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if time.monotonic() - entry[0] >= self.ttl:
+                del self._entries[key]
+                return None
+            value = entry[1]
+        return copy.deepcopy(value)
+    
+    def put(self, key, value):
+        value = copy.deepcopy(value)
+        now = time.monotonic()
+        with self._lock:
+            self._entries.pop(key, None)
+            self._entries[key] = (now, value)
+            # Expired entries sit at the front; the size bound evicts the oldest after that
+            while self._entries:
+                stored_at = next(iter(self._entries.values()))[0]
+                if now - stored_at < self.ttl and len(self._entries) <= self.maxsize:
+                    break
+                self._entries.popitem(last=False)
+
 class PatientDataQuery:
     """Patient data query and analysis system"""
     
@@ -41,14 +271,42 @@ class PatientDataQuery:
             'user': os.getenv('WEBAUTODASH_DB_USER', 'xvoice_user'),
             'password': os.getenv('WEBAUTODASH_DB_PASSWORD', 'Jetson@123')
         }
+        # database -> pool, created on first use so constructing the query object never
+        # touches the network; each pool is bound to its database so checkouts need no USE
+        self._pools: Dict[str, pooling.MySQLConnectionPool] = {}
+        self._pools_lock = threading.Lock()
+        # Cleared if the server rejects multi-statement batches; sections then run in parallel
+        self.multi_statements = True
+        # Provider databases without the ft_patient_name index; name search there uses LIKE
+        self._no_fulltext: set = set()
+        self.executor = None
+        # (provider, limit) -> rows
+        self._list_cache = _TTLCache(PATIENT_LIST_CACHE_TTL, PATIENT_LIST_CACHE_SIZE)
+        # (database, prn, options) -> comprehensive record
+        self._patient_cache = _TTLCache(PATIENT_CACHE_TTL, PATIENT_CACHE_SIZE)
+        # Pooled connection -> {SQL: prepared cursor}; plans survive across checkouts
+        self._prepared = weakref.WeakKeyDictionary()
     
     def get_connection(self, database: str):
-        """Get database connection"""
-        config = self.config.copy()
-        config['database'] = database
-        return mysql.connector.connect(**config)
+        """Get a pooled database connection; close() returns it to the pool"""
+        pool = self._pools.get(database)
+        if pool is None:
+            # Parallel section fetches may race to create the same pool
+            with self._pools_lock:
+                pool = self._pools.get(database)
+                if pool is None:
+                    pool = self._pools[database] = pooling.MySQLConnectionPool(
+                        pool_name=f"pdq_{database}",
+                        pool_size=POOL_SIZE,
+                        pool_reset_session=False,
+                        database=database,
+                        **self.config
+                    )
+        return pool.get_connection()
     
-    def get_provider_database(self, provider_name: str) -> str:
+    @staticmethod
+    @lru_cache(maxsize=None)
+    def get_provider_database(provider_name: str) -> str:
         """Convert provider name to database name"""
         return f"webautodash_{provider_name.lower().replace(' ', '_')}"
     
@@ -59,11 +317,9 @@ class PatientDataQuery:
         
         try:
             if prn:
-                query = "SELECT * FROM patients WHERE prn = %s"
-                cursor.execute(query, (prn,))
+                cursor.execute(PATIENT_BY_PRN_QUERY, (prn,))
             elif patient_name:
-                query = "SELECT * FROM patients WHERE patient_name LIKE %s"
-                cursor.execute(query, (f"%{patient_name}%",))
+                return self._find_patient_by_name(cursor, database, patient_name)
             else:
                 return None
             
@@ -74,194 +330,297 @@ class PatientDataQuery:
             cursor.close()
             conn.close()
     
-    def get_patient_extractions(self, database: str, prn: str) -> List[Dict]:
-        """Get all extraction sessions for a patient"""
-        conn = self.get_connection(database)
-        cursor = conn.cursor(dictionary=True)
+    def _find_patient_by_name(self, cursor, database: str, patient_name: str) -> Optional[Dict]:
+        """Find the first patient whose name contains patient_name"""
+        term = patient_name.replace('"', ' ').strip()
+        if database not in self._no_fulltext and len(term) >= NGRAM_TOKEN_SIZE:
+            try:
+                cursor.execute(PATIENT_BY_NAME_QUERY, (f'"{term}"', f"%{patient_name}%"))
+                row = cursor.fetchone()
+                if row:
+                    return row
+                # Tokens containing stopwords ('a', 'i', ...) are not indexed, so a
+                # short term like 'Li' can miss through FULLTEXT; LIKE decides
+            except mysql.connector.Error as e:
+                if e.errno != errorcode.ER_FT_MATCHING_KEY_NOT_FOUND:
+                    raise
+                self._no_fulltext.add(database)
         
-        try:
-            query = """
-            SELECT pe.*, es.job_name, es.portal_name, es.target_medication, 
-                   es.start_date, es.end_date, es.extracted_at
-            FROM patient_extractions pe
-            JOIN extraction_sessions es ON pe.extraction_session_id = es.id
-            WHERE pe.prn = %s
-            ORDER BY es.extracted_at DESC
-            """
-            cursor.execute(query, (prn,))
-            return cursor.fetchall()
-            
-        finally:
-            cursor.close()
-            conn.close()
+        cursor.execute(PATIENT_BY_NAME_LIKE_QUERY, (f"%{patient_name}%",))
+        return cursor.fetchone()
     
-    def get_patient_medications(self, database: str, prn: str, date_range: tuple = None) -> List[Dict]:
-        """Get all medications for a patient"""
-        conn = self.get_connection(database)
-        cursor = conn.cursor(dictionary=True)
+    def _section_source(self, section: str, prn: str, date_range: tuple = None) -> Tuple[str, List[Any]]:
+        """Build the FROM/WHERE clause and parameters for one per-patient section"""
+        _, source, _, supports_date_range = SECTION_QUERIES[section]
+        # Every placeholder in a section source is the PRN
+        params = [prn] * source.count('%s')
         
-        try:
-            base_query = """
-            SELECT m.*, pe.extraction_session_id, es.target_medication as session_medication,
-                   es.start_date as session_start, es.end_date as session_end,
-                   es.extracted_at, es.job_name
-            FROM medications m
-            JOIN patient_extractions pe ON m.patient_extraction_id = pe.id
-            JOIN extraction_sessions es ON pe.extraction_session_id = es.id
-            WHERE pe.prn = %s
-            """
-            
-            params = [prn]
-            
-            if date_range:
-                base_query += " AND es.start_date >= %s AND es.end_date <= %s"
-                params.extend(date_range)
-            
-            base_query += " ORDER BY m.medication_type, m.created_at DESC"
-            
-            cursor.execute(base_query, params)
-            return cursor.fetchall()
-            
-        finally:
-            cursor.close()
-            conn.close()
+        if date_range and supports_date_range:
+            source += " WHERE es.start_date >= %s AND es.end_date <= %s"
+            params.extend(date_range)
+        
+        return source, params
     
-    def get_patient_diagnoses(self, database: str, prn: str, date_range: tuple = None) -> List[Dict]:
-        """Get all diagnoses for a patient"""
-        conn = self.get_connection(database)
-        cursor = conn.cursor(dictionary=True)
+    def _section_columns(self, section: str, verbose: bool = True) -> str:
+        """Return the SELECT list for a section; the narrow summary list unless verbose"""
+        if not verbose and section in SUMMARY_SECTION_COLUMNS:
+            return SUMMARY_SECTION_COLUMNS[section]
+        return SECTION_QUERIES[section][0]
+    
+    def _section_query(self, section: str, prn: str, date_range: tuple = None,
+                       limit: Optional[int] = None, verbose: bool = True) -> Tuple[str, List[Any]]:
+        """Build the SQL and parameters for one per-patient section"""
+        _, _, order_by, _ = SECTION_QUERIES[section]
+        columns = self._section_columns(section, verbose)
+        source, params = self._section_source(section, prn, date_range)
+        query = f"{columns}{source} ORDER BY {order_by}"
         
-        try:
-            base_query = """
-            SELECT d.*, pe.extraction_session_id, es.start_date as session_start, 
-                   es.end_date as session_end, es.extracted_at, es.job_name
-            FROM diagnoses d
-            JOIN patient_extractions pe ON d.patient_extraction_id = pe.id
-            JOIN extraction_sessions es ON pe.extraction_session_id = es.id
-            WHERE pe.prn = %s
-            """
-            
-            params = [prn]
-            
-            if date_range:
-                base_query += " AND es.start_date >= %s AND es.end_date <= %s"
-                params.extend(date_range)
-            
-            base_query += " ORDER BY d.diagnosis_type, d.created_at DESC"
-            
-            cursor.execute(base_query, params)
-            return cursor.fetchall()
-            
-        finally:
-            cursor.close()
-            conn.close()
+        if limit is not None:
+            query += " LIMIT %s"
+            params.append(limit)
+        
+        return query, params
     
-    def get_patient_allergies(self, database: str, prn: str, date_range: tuple = None) -> List[Dict]:
-        """Get all allergies for a patient"""
+    def _section_count_query(self, section: str, prn: str, date_range: tuple = None) -> Tuple[str, List[Any]]:
+        """Build a COUNT(*) over one section, for totals when its rows are limited"""
+        source, params = self._section_source(section, prn, date_range)
+        return f"SELECT COUNT(*) as total{source}", params
+    
+    def _execute_prepared(self, database: str, query: str, params: List[Any]) -> List[Dict]:
+        """Run a query as a server-side prepared statement cached on its pooled connection"""
         conn = self.get_connection(database)
-        cursor = conn.cursor(dictionary=True)
         
         try:
-            base_query = """
-            SELECT a.*, pe.extraction_session_id, es.start_date as session_start,
-                   es.end_date as session_end, es.extracted_at, es.job_name
-            FROM allergies a
-            JOIN patient_extractions pe ON a.patient_extraction_id = pe.id
-            JOIN extraction_sessions es ON pe.extraction_session_id = es.id
-            WHERE pe.prn = %s
-            """
-            
-            params = [prn]
-            
-            if date_range:
-                base_query += " AND es.start_date >= %s AND es.end_date <= %s"
-                params.extend(date_range)
-            
-            base_query += " ORDER BY a.allergy_type, a.created_at DESC"
-            
-            cursor.execute(base_query, params)
-            return cursor.fetchall()
+            # The pool hands out wrappers; cache on the underlying connection
+            raw_conn = getattr(conn, '_cnx', conn)
+            statements = self._prepared.setdefault(raw_conn, {})
+            cursor = statements.get(query)
+            if cursor is None:
+                cursor = raw_conn.cursor(prepared=True, dictionary=True)
+                statements[query] = cursor
+            
+            try:
+                cursor.execute(query, params)
+                return cursor.fetchall()
+            except mysql.connector.Error:
+                # Don't reuse a statement the server may have dropped
+                statements.pop(query, None)
+                raise
             
         finally:
-            cursor.close()
             conn.close()
     
-    def get_patient_health_concerns(self, database: str, prn: str, date_range: tuple = None) -> List[Dict]:
-        """Get all health concerns for a patient"""
+    def _fetch_section(self, database: str, section: str, prn: str, date_range: tuple = None,
+                       limit: Optional[int] = None, verbose: bool = True) -> List[Dict]:
+        """Run a single section query"""
+        query, params = self._section_query(section, prn, date_range, limit, verbose)
+        return self._execute_prepared(database, query, params)
+    
+    def _count_section(self, database: str, section: str, prn: str, date_range: tuple = None) -> int:
+        """Count the rows of a single section"""
+        query, params = self._section_count_query(section, prn, date_range)
+        return self._execute_prepared(database, query, params)[0]['total']
+    
+    def _section_topn_query(self, section: str, prn: str, per_type: int, date_range: tuple = None,
+                            verbose: bool = True) -> Tuple[str, List[Any]]:
+        """Build a UNION ALL returning the newest per_type rows of each section type"""
+        columns = self._section_columns(section, verbose)
+        type_column, types, recency_column = TYPED_SECTIONS[section]
+        source, params = self._section_source(section, prn, date_range)
+        keyword = " AND" if date_range else " WHERE"
+        
+        parts = []
+        all_params = []
+        for section_type in types:
+            parts.append(f"({columns}{source}{keyword} {type_column} = %s "
+                         f"ORDER BY {recency_column} DESC LIMIT %s)")
+            all_params.extend(params + [section_type, per_type])
+        return "\nUNION ALL\n".join(parts), all_params
+    
+    def _section_type_count_query(self, section: str, prn: str, date_range: tuple = None) -> Tuple[str, List[Any]]:
+        """Build a per-type COUNT(*) over one typed section"""
+        type_column, _, _ = TYPED_SECTIONS[section]
+        source, params = self._section_source(section, prn, date_range)
+        return f"SELECT {type_column} as section_type, COUNT(*) as total{source} GROUP BY {type_column}", params
+    
+    def _section_statements(self, sections: List[str], prn: str, date_range: tuple = None,
+                            limits: Optional[Dict[str, int]] = None,
+                            per_type: Optional[int] = None,
+                            verbose: bool = True) -> List[Tuple[str, str, List[Any]]]:
+        """Build (result name, SQL, params) for each statement needed by the sections.
+        
+        Limited sections also get '<section>_total' with their full row count; with
+        per_type, typed sections return the newest per_type rows of each type plus
+        '<section>_by_type' counts. verbose=False selects only the summary columns.
+        """
+        limits = limits or {}
+        statements = []
+        for section in sections:
+            if per_type is not None and section in TYPED_SECTIONS:
+                statements.append((section, *self._section_topn_query(section, prn, per_type, date_range, verbose)))
+                statements.append((f"{section}_by_type", *self._section_type_count_query(section, prn, date_range)))
+            else:
+                statements.append((section, *self._section_query(
+                    section, prn, date_range, limits.get(section), verbose
+                )))
+                if section in limits:
+                    statements.append((f"{section}_total", *self._section_count_query(section, prn, date_range)))
+        return statements
+    
+    @staticmethod
+    def _statement_result(name: str, rows: List[Dict]) -> Any:
+        """Reduce a statement's rows to the value stored under its result name"""
+        if name.endswith('_total'):
+            return rows[0]['total']
+        if name.endswith('_by_type'):
+            return {row['section_type']: row['total'] for row in rows}
+        if name == 'patient_info':
+            return rows[0] if rows else None
+        return rows
+    
+    def _fetch_sections(self, database: str, statements: List[Tuple[str, str, List[Any]]]) -> Dict[str, Any]:
+        """Run section statements as one multi-statement round trip"""
+        batch = ";\n".join(query for _, query, _ in statements)
+        params = [param for _, _, query_params in statements for param in query_params]
+        
         conn = self.get_connection(database)
         cursor = conn.cursor(dictionary=True)
         
         try:
-            base_query = """
-            SELECT hc.*, pe.extraction_session_id, es.start_date as session_start,
-                   es.end_date as session_end, es.extracted_at, es.job_name
-            FROM health_concerns hc
-            JOIN patient_extractions pe ON hc.patient_extraction_id = pe.id
-            JOIN extraction_sessions es ON pe.extraction_session_id = es.id
-            WHERE pe.prn = %s
-            """
-            
-            params = [prn]
-            
-            if date_range:
-                base_query += " AND es.start_date >= %s AND es.end_date <= %s"
-                params.extend(date_range)
-            
-            base_query += " ORDER BY hc.concern_type, hc.created_at DESC"
-            
-            cursor.execute(base_query, params)
-            return cursor.fetchall()
+            # Result sets come back in statement order
+            results = {}
+            remaining = iter(statements)
+            for result in cursor.execute(batch, params, multi=True):
+                if result.with_rows:
+                    name = next(remaining)[0]
+                    results[name] = self._statement_result(name, result.fetchall())
+            return results
             
         finally:
             cursor.close()
             conn.close()
     
+    def _fetch_sections_parallel(self, database: str, statements: List[Tuple[str, str, List[Any]]]) -> Dict[str, Any]:
+        """Run section statements concurrently, each on its own pooled connection"""
+        if self.executor is None:
+            self.executor = ThreadPoolExecutor(max_workers=len(SECTION_QUERIES))
+        
+        futures = {
+            name: self.executor.submit(self._execute_prepared, database, query, params)
+            for name, query, params in statements
+        }
+        return {name: self._statement_result(name, future.result()) for name, future in futures.items()}
+    
+    def _fetch_sections_any(self, database: str, sections: List[str], prn: str, date_range: tuple = None,
+                            limits: Optional[Dict[str, int]] = None, per_type: Optional[int] = None,
+                            verbose: bool = True, with_demographics: bool = False) -> Dict[str, Any]:
+        """Fetch sections in one round trip, or concurrently if batching is unavailable
+        
+        with_demographics also fetches the patient row by PRN under 'patient_info'.
+        """
+        statements = self._section_statements(sections, prn, date_range, limits, per_type, verbose)
+        if with_demographics:
+            statements.insert(0, ('patient_info', PATIENT_BY_PRN_QUERY, [prn]))
+        if self.multi_statements:
+            try:
+                return self._fetch_sections(database, statements)
+            except mysql.connector.Error:
+                self.multi_statements = False
+        return self._fetch_sections_parallel(database, statements)
+    
+    def get_patient_extractions(self, database: str, prn: str, limit: Optional[int] = None,
+                                verbose: bool = True) -> List[Dict]:
+        """Get all extraction sessions for a patient"""
+        return self._fetch_section(database, 'extractions', prn, limit=limit, verbose=verbose)
+    
+    def get_patient_medications(self, database: str, prn: str, date_range: tuple = None,
+                                limit: Optional[int] = None, verbose: bool = True) -> List[Dict]:
+        """Get all medications for a patient"""
+        return self._fetch_section(database, 'medications', prn, date_range, limit, verbose)
+    
+    def get_patient_diagnoses(self, database: str, prn: str, date_range: tuple = None,
+                              limit: Optional[int] = None, verbose: bool = True) -> List[Dict]:
+        """Get all diagnoses for a patient"""
+        return self._fetch_section(database, 'diagnoses', prn, date_range, limit, verbose)
+    
+    def get_patient_medications_topn(self, database: str, prn: str, per_type: int = SUMMARY_ROWS_PER_TYPE,
+                                     date_range: tuple = None, verbose: bool = True) -> List[Dict]:
+        """Get the newest per_type medications of each medication type"""
+        query, params = self._section_topn_query('medications', prn, per_type, date_range, verbose)
+        return self._execute_prepared(database, query, params)
+    
+    def get_patient_diagnoses_topn(self, database: str, prn: str, per_type: int = SUMMARY_ROWS_PER_TYPE,
+                                   date_range: tuple = None, verbose: bool = True) -> List[Dict]:
+        """Get the newest per_type diagnoses of each diagnosis type"""
+        query, params = self._section_topn_query('diagnoses', prn, per_type, date_range, verbose)
+        return self._execute_prepared(database, query, params)
+    
+    def get_patient_allergies(self, database: str, prn: str, date_range: tuple = None,
+                              limit: Optional[int] = None, verbose: bool = True) -> List[Dict]:
+        """Get all allergies for a patient"""
+        return self._fetch_section(database, 'allergies', prn, date_range, limit, verbose)
+    
+    def get_patient_health_concerns(self, database: str, prn: str, date_range: tuple = None,
+                                    limit: Optional[int] = None, verbose: bool = True) -> List[Dict]:
+        """Get all health concerns for a patient"""
+        return self._fetch_section(database, 'health_concerns', prn, date_range, limit, verbose)
+    
     def get_patient_conflicts(self, database: str, prn: str) -> List[Dict]:
         """Get all data conflicts for a patient"""
-        conn = self.get_connection(database)
-        cursor = conn.cursor(dictionary=True)
-        
-        try:
-            query = """
-            SELECT dc.*, p.patient_name,
-                   es1.job_name as session1_name, es1.extracted_at as session1_time,
-                   es2.job_name as session2_name, es2.extracted_at as session2_time
-            FROM data_conflicts dc
-            JOIN patients p ON dc.patient_id = p.id
-            LEFT JOIN extraction_sessions es1 ON dc.extraction_session_id_1 = es1.id
-            LEFT JOIN extraction_sessions es2 ON dc.extraction_session_id_2 = es2.id
-            WHERE dc.prn = %s
-            ORDER BY dc.detected_at DESC
-            """
-            
-            cursor.execute(query, (prn,))
-            return cursor.fetchall()
-            
-        finally:
-            cursor.close()
-            conn.close()
+        sections = self._fetch_sections_any(database, ['conflicts', 'conflict_sessions'], prn)
+        return attach_conflict_sessions(sections['conflicts'], sections['conflict_sessions'])
     
     def get_comprehensive_patient_data(self, provider: str, prn: str = None, 
-                                     patient_name: str = None, date_range: tuple = None) -> Dict[str, Any]:
-        """Get complete patient medical data"""
-        database = self.get_provider_database(provider)
+                                     patient_name: str = None, date_range: tuple = None,
+                                     section_limits: Optional[Dict[str, int]] = None,
+                                     rows_per_type: Optional[int] = None,
+                                     verbose: bool = True) -> Dict[str, Any]:
+        """Get complete patient medical data
         
-        # Get patient demographics first
-        demographics = self.get_patient_demographics(database, prn, patient_name)
-        if not demographics:
-            return {'error': 'Patient not found'}
+        section_limits caps the rows returned per section and rows_per_type the rows of
+        each medication/diagnosis type; summary totals stay exact. verbose=False returns
+        only the columns print_patient_summary uses.
+        """
+        database = self.get_provider_database(provider)
+        options = (date_range, tuple(sorted((section_limits or {}).items())), rows_per_type, verbose)
         
-        patient_prn = demographics['prn']
+        if prn:
+            cached = self._cached_patient(database, prn, options)
+            if cached:
+                return cached
+            
+            # The PRN is already known, so fetch demographics in the same round trip
+            sections = self._fetch_sections_any(
+                database, list(SECTION_QUERIES), prn, date_range, section_limits, rows_per_type, verbose,
+                with_demographics=True
+            )
+            demographics = sections['patient_info']
+            if not demographics:
+                return {'error': 'Patient not found'}
+        else:
+            # Resolve the PRN from the name first
+            demographics = self.get_patient_demographics(database, prn, patient_name)
+            if not demographics:
+                return {'error': 'Patient not found'}
+            
+            prn = demographics['prn']
+            cached = self._cached_patient(database, prn, options)
+            if cached:
+                return cached
+            
+            sections = self._fetch_sections_any(
+                database, list(SECTION_QUERIES), prn, date_range, section_limits,
+                rows_per_type, verbose
+            )
         
-        # Get all medical data
         result = {
             'patient_info': demographics,
-            'extractions': self.get_patient_extractions(database, patient_prn),
-            'medications': self.get_patient_medications(database, patient_prn, date_range),
-            'diagnoses': self.get_patient_diagnoses(database, patient_prn, date_range),
-            'allergies': self.get_patient_allergies(database, patient_prn, date_range),
-            'health_concerns': self.get_patient_health_concerns(database, patient_prn, date_range),
-            'conflicts': self.get_patient_conflicts(database, patient_prn),
+            'extractions': sections['extractions'],
+            'medications': sections['medications'],
+            'diagnoses': sections['diagnoses'],
+            'allergies': sections['allergies'],
+            'health_concerns': sections['health_concerns'],
+            'conflicts': attach_conflict_sessions(sections['conflicts'], sections['conflict_sessions']),
             'summary': {
                 'total_extractions': 0,
                 'total_medications': 0,
@@ -272,41 +631,63 @@ class PatientDataQuery:
             }
         }
         
-        # Generate summary
-        result['summary']['total_extractions'] = len(result['extractions'])
-        result['summary']['total_medications'] = len(result['medications'])
-        result['summary']['total_diagnoses'] = len(result['diagnoses'])
-        result['summary']['total_allergies'] = len(result['allergies'])
-        result['summary']['total_health_concerns'] = len(result['health_concerns'])
-        result['summary']['total_conflicts'] = len(result['conflicts'])
+        # Generate summary; limited sections report their counted total
+        for section in ('extractions', 'medications', 'diagnoses', 'allergies', 'health_concerns', 'conflicts'):
+            result['summary'][f'total_{section}'] = sections.get(f'{section}_total', len(result[section]))
+        for section in TYPED_SECTIONS:
+            by_type = sections.get(f'{section}_by_type')
+            if by_type is not None:
+                result['summary'][f'total_{section}'] = sum(by_type.values())
+                result['summary'][f'{section}_by_type'] = by_type
         
+        self._patient_cache.put((database, prn, options), result)
         return result
     
+    def _cached_patient(self, database: str, prn: str, options: Tuple) -> Optional[Dict[str, Any]]:
+        """Return a copy of a comprehensive record fetched within PATIENT_CACHE_TTL, if any"""
+        # Dashboards refresh the same patient every few seconds
+        return self._patient_cache.get((database, prn, options))
+    
     def list_patients(self, provider: str, limit: int = 50) -> List[Dict]:
         """List all patients for a provider"""
+        # Dashboards poll this; serve repeated calls from a short-lived cache
+        cache_key = (provider, limit)
+        cached = self._list_cache.get(cache_key)
+        if cached is not None:
+            return cached
+        
         database = self.get_provider_database(provider)
         conn = self.get_connection(database)
         cursor = conn.cursor(dictionary=True)
         
         try:
+            # Correlated per-patient counts instead of one join across every
+            # medication/diagnosis/conflict row followed by COUNT(DISTINCT); the
+            # derived table applies the limit first so only those patients are counted
             query = """
-            SELECT p.*, 
-                   COUNT(DISTINCT pe.extraction_session_id) as total_extractions,
-                   COUNT(DISTINCT m.id) as total_medications,
-                   COUNT(DISTINCT d.id) as total_diagnoses,
-                   COUNT(DISTINCT dc.id) as total_conflicts
-            FROM patients p
-            LEFT JOIN patient_extractions pe ON p.prn = pe.prn
-            LEFT JOIN medications m ON pe.id = m.patient_extraction_id
-            LEFT JOIN diagnoses d ON pe.id = d.patient_extraction_id
-            LEFT JOIN data_conflicts dc ON p.prn = dc.prn
-            GROUP BY p.id
+            SELECT p.*,
+                   (SELECT COUNT(DISTINCT pe.extraction_session_id)
+                    FROM patient_extractions pe
+                    WHERE pe.prn = p.prn) as total_extractions,
+                   (SELECT COUNT(*)
+                    FROM medications m
+                    JOIN patient_extractions pe ON m.patient_extraction_id = pe.id
+                    WHERE pe.prn = p.prn) as total_medications,
+                   (SELECT COUNT(*)
+                    FROM diagnoses d
+                    JOIN patient_extractions pe ON d.patient_extraction_id = pe.id
+                    WHERE pe.prn = p.prn) as total_diagnoses,
+                   (SELECT COUNT(*)
+                    FROM data_conflicts dc
+                    WHERE dc.prn = p.prn) as total_conflicts
+            FROM (SELECT * FROM patients ORDER BY patient_name LIMIT %s) p
             ORDER BY p.patient_name
-            LIMIT %s
             """
             
             cursor.execute(query, (limit,))
-            return cursor.fetchall()
+            patients = cursor.fetchall()
+            self._list_cache.put(cache_key, patients)
+            return patients
             
         finally:
             cursor.close()
@@ -314,122 +695,145 @@ class PatientDataQuery:
     
     def get_provider_conflicts(self, provider: str) -> List[Dict]:
         """Get all conflicts for a provider"""
+        return list(self.iter_provider_conflicts(provider))
+    
+    def iter_provider_conflicts(self, provider: str) -> Iterator[Dict]:
+        """Yield all conflicts for a provider, streaming rows from an unbuffered cursor"""
         database = self.get_provider_database(provider)
         conn = self.get_connection(database)
-        cursor = conn.cursor(dictionary=True)
         
         try:
-            query = """
-            SELECT dc.*, p.patient_name,
-                   es1.job_name as session1_name, es1.extracted_at as session1_time,
-                   es2.job_name as session2_name, es2.extracted_at as session2_time
-            FROM data_conflicts dc
-            JOIN patients p ON dc.patient_id = p.id
-            LEFT JOIN extraction_sessions es1 ON dc.extraction_session_id_1 = es1.id
-            LEFT JOIN extraction_sessions es2 ON dc.extraction_session_id_2 = es2.id
-            ORDER BY dc.detected_at DESC
-            """
-            
-            cursor.execute(query)
-            return cursor.fetchall()
+            # The session lookup is small; fetch it up front so rows can be completed as they stream
+            cursor = conn.cursor(dictionary=True)
+            try:
+                cursor.execute(PROVIDER_CONFLICT_SESSIONS_QUERY)
+                sessions_by_id = {session['id']: session for session in cursor.fetchall()}
+            finally:
+                cursor.close()
+            
+            cursor = conn.cursor(dictionary=True, buffered=False)
+            try:
+                cursor.execute(PROVIDER_CONFLICTS_QUERY)
+                for conflict in cursor:
+                    yield apply_conflict_sessions(conflict, sessions_by_id)
+            finally:
+                # Drain rows left unread if the caller stopped early, so the pooled connection stays usable
+                conn.consume_results()
+                cursor.close()
             
         finally:
-            cursor.close()
             conn.close()
 
+@lru_cache(maxsize=4096)
+def _strftime(dt: datetime) -> str:
+    # Timestamps cluster (many rows share a second), so repeated values skip strftime
+    return dt.strftime("%Y-%m-%d %H:%M:%S")
+
 def format_datetime(dt):
     """Format datetime for display"""
     if dt is None:
         return "N/A"
     if isinstance(dt, datetime):
-        return dt.strftime("%Y-%m-%d %H:%M:%S")
+        return _strftime(dt)
     return str(dt)
 
 def print_patient_summary(data: Dict[str, Any]):
     """Print formatted patient summary"""
     patient = data['patient_info']
     summary = data['summary']
+    # Collected and written once instead of one print() per line
+    out = []
     
-    print(f"\n{'='*80}")
-    print(f"PATIENT MEDICAL RECORD")
-    print(f"{'='*80}")
+    out.append(f"\n{'='*80}")
+    out.append(f"PATIENT MEDICAL RECORD")
+    out.append(f"{'='*80}")
     
     # Demographics
-    print(f"📋 PATIENT INFORMATION:")
-    print(f"   PRN: {patient['prn']}")
-    print(f"   Name: {patient['patient_name']}")
-    print(f"   DOB: {patient['date_of_birth']} (Age: {patient['age']})")
-    print(f"   Gender: {patient['gender']}")
-    print(f"   UUID: {patient['patient_uuid']}")
+    out.append(f"📋 PATIENT INFORMATION:")
+    out.append(f"   PRN: {patient['prn']}")
+    out.append(f"   Name: {patient['patient_name']}")
+    out.append(f"   DOB: {patient['date_of_birth']} (Age: {patient['age']})")
+    out.append(f"   Gender: {patient['gender']}")
+    out.append(f"   UUID: {patient['patient_uuid']}")
     
     # Summary statistics
-    print(f"\n📊 MEDICAL DATA SUMMARY:")
-    print(f"   Extraction Sessions: {summary['total_extractions']}")
-    print(f"   Medications: {summary['total_medications']}")
-    print(f"   Diagnoses: {summary['total_diagnoses']}")
-    print(f"   Allergies: {summary['total_allergies']}")
-    print(f"   Health Concerns: {summary['total_health_concerns']}")
-    print(f"   Data Conflicts: {summary['total_conflicts']}")
+    out.append(f"\n📊 MEDICAL DATA SUMMARY:")
+    out.append(f"   Extraction Sessions: {summary['total_extractions']}")
+    out.append(f"   Medications: {summary['total_medications']}")
+    out.append(f"   Diagnoses: {summary['total_diagnoses']}")
+    out.append(f"   Allergies: {summary['total_allergies']}")
+    out.append(f"   Health Concerns: {summary['total_health_concerns']}")
+    out.append(f"   Data Conflicts: {summary['total_conflicts']}")
     
     # Extraction sessions
     if data['extractions']:
-        print(f"\n🔍 EXTRACTION SESSIONS:")
+        out.append(f"\n🔍 EXTRACTION SESSIONS:")
         for ext in data['extractions'][:5]:  # Show latest 5
-            print(f"   • {ext['job_name']} ({ext['portal_name']})")
-            print(f"     Target: {ext['filter_medication_name']}")
-            print(f"     Date Range: {ext['filter_start_date']} to {ext['filter_stop_date']}")
-            print(f"     Extracted: {format_datetime(ext['extracted_at'])}")
+            out.append(f"   • {ext['job_name']} ({ext['portal_name']})")
+            out.append(f"     Target: {ext['filter_medication_name']}")
+            out.append(f"     Date Range: {ext['filter_start_date']} to {ext['filter_stop_date']}")
+            out.append(f"     Extracted: {format_datetime(ext['extracted_at'])}")
     
     # Medications by type
     if data['medications']:
-        print(f"\n💊 MEDICATIONS:")
+        out.append(f"\n💊 MEDICATIONS:")
+        med_counts = summary.get('medications_by_type', {})
+        meds_by_type = defaultdict(list)
+        for med in data['medications']:
+            meds_by_type[med['medication_type']].append(med)
         for med_type in ['active', 'current', 'historical']:
-            meds = [m for m in data['medications'] if m['medication_type'] == med_type]
+            meds = meds_by_type.get(med_type)
             if meds:
-                print(f"   {med_type.upper()} ({len(meds)}):")
+                out.append(f"   {med_type.upper()} ({med_counts.get(med_type, len(meds))}):")
                 for med in meds[:3]:  # Show first 3 of each type
-                    print(f"     • {med['medication_name']}")
+                    out.append(f"     • {med['medication_name']}")
                     if med['medication_strength']:
-                        print(f"       Strength: {med['medication_strength']}")
+                        out.append(f"       Strength: {med['medication_strength']}")
                     if med['sig']:
-                        print(f"       Sig: {med['sig'][:100]}...")
+                        out.append(f"       Sig: {med['sig'][:100]}...")
     
     # Diagnoses
     if data['diagnoses']:
-        print(f"\n🏥 DIAGNOSES:")
+        out.append(f"\n🏥 DIAGNOSES:")
+        diag_counts = summary.get('diagnoses_by_type', {})
+        diags_by_type = defaultdict(list)
+        for diag in data['diagnoses']:
+            diags_by_type[diag['diagnosis_type']].append(diag)
         for diag_type in ['current', 'historical']:
-            diags = [d for d in data['diagnoses'] if d['diagnosis_type'] == diag_type]
+            diags = diags_by_type.get(diag_type)
             if diags:
-                print(f"   {diag_type.upper()} ({len(diags)}):")
+                out.append(f"   {diag_type.upper()} ({diag_counts.get(diag_type, len(diags))}):")
                 for diag in diags[:3]:  # Show first 3 of each type
-                    print(f"     • {diag['diagnosis_text']}")
+                    out.append(f"     • {diag['diagnosis_text']}")
                     if diag['acuity']:
-                        print(f"       Acuity: {diag['acuity']}")
+                        out.append(f"       Acuity: {diag['acuity']}")
     
     # Allergies
     if data['allergies']:
-        print(f"\n⚠️ ALLERGIES ({len(data['allergies'])}):")
+        out.append(f"\n⚠️ ALLERGIES ({summary['total_allergies']}):")
         for allergy in data['allergies'][:5]:
-            print(f"   • {allergy['allergy_name']} ({allergy['allergy_type']})")
+            out.append(f"   • {allergy['allergy_name']} ({allergy['allergy_type']})")
             if allergy['reaction']:
-                print(f"     Reaction: {allergy['reaction']}")
+                out.append(f"     Reaction: {allergy['reaction']}")
     
     # Health concerns
     if data['health_concerns']:
-        print(f"\n🩺 HEALTH CONCERNS ({len(data['health_concerns'])}):")
+        out.append(f"\n🩺 HEALTH CONCERNS ({summary['total_health_concerns']}):")
         for concern in data['health_concerns'][:3]:
             concern_text = concern['concern_text']
             if len(concern_text) > 100:
                 concern_text = concern_text[:100] + "..."
-            print(f"   • {concern_text}")
+            out.append(f"   • {concern_text}")
     
     # Conflicts
     if data['conflicts']:
-        print(f"\n⚠️ DATA CONFLICTS ({len(data['conflicts'])}):")
+        out.append(f"\n⚠️ DATA CONFLICTS ({len(data['conflicts'])}):")
         for conflict in data['conflicts']:
-            print(f"   • {conflict['conflict_type']}: {conflict['conflict_description']}")
-            print(f"     Severity: {conflict['severity']} | Status: {conflict['status']}")
-            print(f"     Detected: {format_datetime(conflict['detected_at'])}")
+            out.append(f"   • {conflict['conflict_type']}: {conflict['conflict_description']}")
+            out.append(f"     Severity: {conflict['severity']} | Status: {conflict['status']}")
+            out.append(f"     Detected: {format_datetime(conflict['detected_at'])}")
+    
+    sys.stdout.write("\n".join(out) + "\n")
 
 def main():
     """Main CLI function"""
@@ -473,7 +877,7 @@ Examples:
             patients = query_system.list_patients(args.provider, args.limit)
             
             if args.json:
-                print(json.dumps(patients, default=str, indent=2))
+                print(dumps_json(patients))
             else:
                 print(f"\n📋 PATIENTS FOR PROVIDER: {args.provider}")
                 print(f"{'='*80}")
@@ -484,10 +888,10 @@ Examples:
                           f"Conflicts: {patient['total_conflicts']:2}")
         
         elif args.conflicts:
-            conflicts = query_system.get_provider_conflicts(args.provider)
+            conflicts = query_system.iter_provider_conflicts(args.provider)
             
             if args.json:
-                print(json.dumps(conflicts, default=str, indent=2))
+                write_json_array(conflicts)
             else:
                 print(f"\n⚠️ DATA CONFLICTS FOR PROVIDER: {args.provider}")
                 print(f"{'='*80}")
@@ -499,8 +903,12 @@ Examples:
                     print(f"{'-'*40}")
         
         elif args.prn or args.patient_name:
+            # The printed summary only shows the first few rows of some sections
             data = query_system.get_comprehensive_patient_data(
-                args.provider, args.prn, args.patient_name, date_range
+                args.provider, args.prn, args.patient_name, date_range,
+                section_limits=None if args.json else SUMMARY_SECTION_LIMITS,
+                rows_per_type=None if args.json else SUMMARY_ROWS_PER_TYPE,
+                verbose=args.json
             )
             
             if 'error' in data:
@@ -508,7 +916,7 @@ Examples:
                 return
             
             if args.json:
-                print(json.dumps(data, default=str, indent=2))
+                print(dumps_json(data))
             else:
                 print_patient_summary(data)
         
@@ -3,15 +3,71 @@ Results Storage Utility for WebAutoDash
 Handles saving extraction results with proper naming convention and directory structure
 """
 
+import asyncio
+import heapq
 import os
 import json
+import mmap
 import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from operator import itemgetter
 from datetime import datetime
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Iterable, Iterator, List, Optional, Set, Tuple
 import logging
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Chosen once; both accept the raw bytes of a results file
+_json_loads = orjson.loads if orjson is not None else json.loads
+
 logger = logging.getLogger(__name__)
 
+# Results files at least this large are parsed straight from a memory map
+MMAP_LOAD_THRESHOLD = 1024 * 1024
+
+# Concurrent file writes used by save_results_batch
+BATCH_WRITE_WORKERS = 8
+
+def _dumps_json(data: Any, pretty: bool = False) -> bytes:
+    """Encode data as compact UTF-8 JSON, or indented when pretty; orjson is much faster"""
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS
+        if pretty:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(data, option=option)
+    if pretty:
+        return json.dumps(data, indent=2, ensure_ascii=False).encode('utf-8')
+    return json.dumps(data, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+
+# Runs of characters not allowed in filenames, underscores included so they collapse too
+_INVALID_FILENAME_RUN_RE = re.compile(r'(?:[^\w\-.]|_)+')
+
+@lru_cache(maxsize=1024)
+def _sanitize_component(component: str) -> str:
+    """Sanitize a non-empty component; cached since the same few names recur on every save"""
+    # Replace each run of invalid characters and underscores with a single underscore,
+    # then remove leading/trailing underscores
+    sanitized = _INVALID_FILENAME_RUN_RE.sub('_', component.lower()).strip('_')
+    
+    return sanitized if sanitized else "unknown"
+
+def _taken_counts(names: Iterable[str], prefix: str) -> Set[int]:
+    """Counts already used by {prefix}{count:03d}.json names"""
+    taken = set()
+    start = len(prefix)
+    for name in names:
+        # Only the exact three-digit form can collide with a generated name
+        if len(name) == start + 8 and name.startswith(prefix) and name.endswith('.json'):
+            digits = name[start:start + 3]
+            if digits.isascii() and digits.isdigit():
+                taken.add(int(digits))
+    return taken
+
 class ResultsStorage:
     def __init__(self, base_results_dir: str = "Projects/WebAutoDash/Results"):
         """
@@ -21,6 +77,11 @@ class ResultsStorage:
             base_results_dir: Base directory for storing results
         """
         self.base_results_dir = base_results_dir
+        # Provider directories already created by this instance; saves skip makedirs for them
+        self._ensured_dirs: Set[str] = set()
+        self._ensured_dirs_lock = threading.Lock()
+        # Provider name -> provider directory path
+        self._provider_dirs: Dict[str, str] = {}
         self.ensure_results_directory()
     
     def ensure_results_directory(self):
@@ -43,15 +104,28 @@ class ResultsStorage:
             Path to the provider directory
         """
         try:
-            sanitized_provider = self.sanitize_filename_component(provider_name)
-            provider_dir = os.path.join(self.base_results_dir, sanitized_provider)
-            os.makedirs(provider_dir, exist_ok=True)
+            provider_dir = self._provider_dir(provider_name)
+            if provider_dir in self._ensured_dirs:
+                return provider_dir
+            
+            with self._ensured_dirs_lock:
+                os.makedirs(provider_dir, exist_ok=True)
+                self._ensured_dirs.add(provider_dir)
             logger.info(f"Provider directory ensured: {provider_dir}")
             return provider_dir
         except Exception as e:
             logger.error(f"Failed to create provider directory for {provider_name}: {e}")
             raise
     
+    def _provider_dir(self, provider_name: str) -> str:
+        """Path of a provider's results directory, built once per provider name"""
+        provider_dir = self._provider_dirs.get(provider_name)
+        if provider_dir is None:
+            sanitized_provider = self.sanitize_filename_component(provider_name)
+            provider_dir = os.path.join(self.base_results_dir, sanitized_provider)
+            self._provider_dirs[provider_name] = provider_dir
+        return provider_dir
+    
     def sanitize_filename_component(self, component: str) -> str:
         """
         Sanitize a component for use in filename
@@ -65,16 +139,10 @@ class ResultsStorage:
         if not component:
             return "unknown"
         
-        # Remove/replace invalid characters
-        sanitized = re.sub(r'[^\w\-_.]', '_', component.lower())
-        # Remove multiple underscores
-        sanitized = re.sub(r'_+', '_', sanitized)
-        # Remove leading/trailing underscores
-        sanitized = sanitized.strip('_')
-        
-        return sanitized if sanitized else "unknown"
+        return _sanitize_component(component)
     
-    def generate_filename(self, job_data: Dict[str, Any], provider_dir: str) -> str:
+    def generate_filename(self, job_data: Dict[str, Any], provider_dir: str,
+                          reserved: Optional[Set[str]] = None, now: Optional[datetime] = None) -> str:
         """
         Generate filename using the specified convention:
         {provider_name}_{portal_name}_{mode}_{date}_{count}.json
@@ -82,6 +150,8 @@ class ResultsStorage:
         Args:
             job_data: Job data containing necessary information
             provider_dir: Directory path for the provider
+            reserved: Filenames already claimed but not yet written
+            now: Save time to date the filename with; defaults to the current time
             
         Returns:
             Generated filename
@@ -97,30 +167,34 @@ class ResultsStorage:
         mode = self.sanitize_filename_component(extraction_mode.lower())
         
         # Generate date string
-        date_str = datetime.now().strftime('%Y%m%d')
+        now = now or datetime.now()
+        date_str = now.strftime('%Y%m%d')
         
         # Generate base filename without count
         base_filename = f"{provider_name}_{portal_name}_{mode}_{date_str}"
         
-        # Find next available count
+        # Find next available count against one directory read instead of
+        # probing each candidate with os.path.exists
+        prefix = f"{base_filename}_"
+        with os.scandir(provider_dir) as entries:
+            taken = _taken_counts((entry.name for entry in entries), prefix)
+        if reserved:
+            taken |= _taken_counts(reserved, prefix)
+        
         count = 1
-        while True:
-            filename = f"{base_filename}_{count:03d}.json"
-            filepath = os.path.join(provider_dir, filename)
-            
-            if not os.path.exists(filepath):
-                break
-            
+        while count in taken:
             count += 1
-            
-            # Safety check to prevent infinite loop
-            if count > 999:
-                filename = f"{base_filename}_{datetime.now().strftime('%H%M%S')}.json"
-                break
+        
+        if count <= 999:
+            filename = f"{base_filename}_{count:03d}.json"
+        else:
+            # Every numbered slot is used; fall back to a time suffix
+            filename = f"{base_filename}_{now.strftime('%H%M%S')}.json"
         
         return filename
     
-    def save_results(self, job_data: Dict[str, Any], extraction_results: Dict[str, Any]) -> str:
+    def save_results(self, job_data: Dict[str, Any], extraction_results: Dict[str, Any],
+                     pretty: bool = False) -> str:
         """
         Save extraction results to a JSON file with proper naming convention
         in a provider-specific subfolder
@@ -128,42 +202,14 @@ class ResultsStorage:
         Args:
             job_data: Job data for filename generation
             extraction_results: The actual extraction results to save
+            pretty: Indent the JSON for reading by hand; compact by default
             
         Returns:
             Full path to the saved file
         """
         try:
-            # Get provider name and ensure provider directory exists
-            doctor_name = job_data.get('doctor_name', 'unknown_provider')
-            provider_dir = self.ensure_provider_directory(doctor_name)
-            
-            # Generate filename
-            filename = self.generate_filename(job_data, provider_dir)
-            filepath = os.path.join(provider_dir, filename)
-            
-            # Prepare results data with metadata
-            results_with_metadata = {
-                'extraction_metadata': {
-                    'job_id': job_data.get('id'),
-                    'job_name': job_data.get('job_name'),
-                    'extraction_mode': job_data.get('extraction_mode'),
-                    'provider_name': job_data.get('doctor_name'),
-                    'portal_name': job_data.get('adapter_name'),
-                    'target_url': job_data.get('target_url'),
-                    'patient_identifier': job_data.get('input_patient_identifier'),
-                    'medication': job_data.get('medication'),
-                    'start_date': job_data.get('start_date'),
-                    'end_date': job_data.get('end_date'),
-                    'extracted_at': datetime.now().isoformat(),
-                    'results_filename': filename,
-                    'provider_directory': os.path.basename(provider_dir)
-                },
-                'extraction_results': extraction_results
-            }
-            
-            # Save to file
-            with open(filepath, 'w', encoding='utf-8') as f:
-                json.dump(results_with_metadata, f, indent=2, ensure_ascii=False)
+            filepath, payload = self._prepare_results(job_data, extraction_results, pretty=pretty)
+            self._write_results_file(filepath, payload)
             
             logger.info(f"Results saved successfully: {filepath}")
             return filepath
@@ -172,6 +218,129 @@ class ResultsStorage:
             logger.error(f"Failed to save results: {e}")
             raise
     
+    async def save_results_async(self, job_data: Dict[str, Any], extraction_results: Dict[str, Any],
+                                 pretty: bool = False) -> str:
+        """
+        Save extraction results like save_results without blocking the event loop
+        
+        Args:
+            job_data: Job data for filename generation
+            extraction_results: The actual extraction results to save
+            pretty: Indent the JSON for reading by hand; compact by default
+            
+        Returns:
+            Full path to the saved file
+        """
+        # Directory setup, encoding and the write all run on a worker thread
+        return await asyncio.to_thread(self.save_results, job_data, extraction_results, pretty)
+    
+    def save_results_batch(self, jobs: List[Tuple[Dict[str, Any], Dict[str, Any]]],
+                           pretty: bool = False) -> List[str]:
+        """
+        Save several extraction results at once, writing the files concurrently
+        
+        Args:
+            jobs: (job_data, extraction_results) pairs, as passed to save_results
+            pretty: Indent the JSON for reading by hand; compact by default
+            
+        Returns:
+            Full paths to the saved files, in the order of jobs
+        """
+        try:
+            # Names are claimed serially so results in the same batch never collide
+            reserved = set()
+            prepared = []
+            for job_data, extraction_results in jobs:
+                filepath, payload = self._prepare_results(job_data, extraction_results, reserved, pretty)
+                reserved.add(os.path.basename(filepath))
+                prepared.append((filepath, payload))
+            
+            with ThreadPoolExecutor(max_workers=BATCH_WRITE_WORKERS) as executor:
+                list(executor.map(lambda item: self._write_results_file(*item), prepared))
+            
+            filepaths = [filepath for filepath, _ in prepared]
+            logger.info(f"Saved {len(filepaths)} results files")
+            return filepaths
+            
+        except Exception as e:
+            logger.error(f"Failed to save results batch: {e}")
+            raise
+    
+    def _prepare_results(self, job_data: Dict[str, Any], extraction_results: Dict[str, Any],
+                         reserved: Optional[Set[str]] = None, pretty: bool = False) -> Tuple[str, List[bytes]]:
+        """Pick the file path for a result and encode it with its metadata"""
+        # Get provider name and ensure provider directory exists
+        doctor_name = job_data.get('doctor_name', 'unknown_provider')
+        provider_dir = self.ensure_provider_directory(doctor_name)
+        
+        # Generate filename
+        # One timestamp dates both the filename and the metadata
+        now = datetime.now()
+        try:
+            filename = self.generate_filename(job_data, provider_dir, reserved, now)
+        except FileNotFoundError:
+            # Removed from outside since it was ensured; recreate it and retry once
+            with self._ensured_dirs_lock:
+                self._ensured_dirs.discard(provider_dir)
+            provider_dir = self.ensure_provider_directory(doctor_name)
+            filename = self.generate_filename(job_data, provider_dir, reserved, now)
+        filepath = os.path.join(provider_dir, filename)
+        
+        # Prepare metadata for the results
+        metadata = {
+            'job_id': job_data.get('id'),
+            'job_name': job_data.get('job_name'),
+            'extraction_mode': job_data.get('extraction_mode'),
+            'provider_name': job_data.get('doctor_name'),
+            'portal_name': job_data.get('adapter_name'),
+            'target_url': job_data.get('target_url'),
+            'patient_identifier': job_data.get('input_patient_identifier'),
+            'medication': job_data.get('medication'),
+            'start_date': job_data.get('start_date'),
+            'end_date': job_data.get('end_date'),
+            'extracted_at': now.isoformat(),
+            'results_filename': filename,
+            'provider_directory': os.path.basename(provider_dir)
+        }
+        
+        if pretty:
+            results_with_metadata = {
+                'extraction_metadata': metadata,
+                'extraction_results': extraction_results
+            }
+            return filepath, [_dumps_json(results_with_metadata, pretty=True)]
+        
+        # Compact output is framed by hand so the large results are encoded on their own
+        # and written as a separate chunk, never copied into one combined buffer
+        return filepath, [
+            b'{"extraction_metadata":', _dumps_json(metadata),
+            b',"extraction_results":', _dumps_json(extraction_results),
+            b'}'
+        ]
+    
+    def _write_results_file(self, filepath: str, payload: List[bytes]):
+        """Write an encoded results file from its chunks, atomically"""
+        # Written beside the target and renamed into place, so a crash mid-write never
+        # leaves a truncated .json behind; the chunks are already bytes, so write
+        # straight to the descriptor and skip Python's buffered file object
+        tmp_path = filepath + '.tmp'
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, 'O_BINARY', 0), 0o644)
+        try:
+            try:
+                for chunk in payload:
+                    view = memoryview(chunk)
+                    while view:
+                        view = view[os.write(fd, view):]
+            finally:
+                os.close(fd)
+            os.replace(tmp_path, filepath)
+        except Exception:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            raise
+    
     def load_results(self, filepath: str) -> Dict[str, Any]:
         """
         Load results from a JSON file
@@ -183,71 +352,99 @@ class ResultsStorage:
             Loaded results data
         """
         try:
-            with open(filepath, 'r', encoding='utf-8') as f:
-                return json.load(f)
+            with open(filepath, 'rb') as f:
+                # orjson parses any buffer, so large files skip the read into a bytes copy
+                if orjson is not None and os.fstat(f.fileno()).st_size >= MMAP_LOAD_THRESHOLD:
+                    with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                        with memoryview(mapped) as view:
+                            return orjson.loads(view)
+                return _json_loads(f.read())
         except Exception as e:
             logger.error(f"Failed to load results from {filepath}: {e}")
             raise
     
-    def list_results_files(self, provider_name: Optional[str] = None) -> list:
+    def list_results_files(self, provider_name: Optional[str] = None,
+                           limit: Optional[int] = None) -> list:
         """
         List all results files in the results directory or a specific provider directory
         
         Args:
             provider_name: Optional provider name to filter results
+            limit: Optional number of most recent files to return
             
         Returns:
-            List of results filenames with their provider paths
+            List of results filenames with their provider paths and modification times
         """
         try:
-            if not os.path.exists(self.base_results_dir):
-                return []
-            
-            files = []
+            files = self._iter_results_files(provider_name)
             
-            if provider_name:
-                # List files for specific provider
-                sanitized_provider = self.sanitize_filename_component(provider_name)
-                provider_dir = os.path.join(self.base_results_dir, sanitized_provider)
-                
-                if os.path.exists(provider_dir):
-                    for filename in os.listdir(provider_dir):
-                        if filename.endswith('.json'):
-                            files.append({
-                                'filename': filename,
-                                'provider': sanitized_provider,
-                                'full_path': os.path.join(provider_dir, filename)
-                            })
-            else:
-                # List files from all providers
-                for item in os.listdir(self.base_results_dir):
-                    item_path = os.path.join(self.base_results_dir, item)
-                    
-                    if os.path.isdir(item_path):
-                        # This is a provider directory
-                        for filename in os.listdir(item_path):
-                            if filename.endswith('.json'):
-                                files.append({
-                                    'filename': filename,
-                                    'provider': item,
-                                    'full_path': os.path.join(item_path, filename)
-                                })
-                    elif item.endswith('.json'):
-                        # Legacy file in root directory
-                        files.append({
-                            'filename': item,
-                            'provider': 'root',
-                            'full_path': os.path.join(self.base_results_dir, item)
-                        })
-            
-            # Sort by modification time (most recent first)
-            files.sort(key=lambda x: os.path.getmtime(x['full_path']), reverse=True)
-            return files
+            # Sort by modification time (most recent first), captured during the scan
+            if limit is not None:
+                return heapq.nlargest(limit, files, key=itemgetter('mtime'))
+            return sorted(files, key=itemgetter('mtime'), reverse=True)
             
         except Exception as e:
             logger.error(f"Failed to list results files: {e}")
             return []
     
+    def _iter_results_files(self, provider_name: Optional[str] = None,
+                            providers: Optional[List[str]] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Yield results files, unsorted, as the directories are read
+        
+        Args:
+            provider_name: Optional provider name to filter results
+            providers: Optional list that collects each provider directory walked
+            
+        Yields:
+            Results filename with its provider, path and modification time
+        """
+        if not os.path.exists(self.base_results_dir):
+            return
+        
+        if provider_name:
+            # List files for specific provider
+            sanitized_provider = self.sanitize_filename_component(provider_name)
+            provider_dir = self._provider_dir(provider_name)
+            
+            if os.path.exists(provider_dir):
+                with os.scandir(provider_dir) as entries:
+                    for entry in entries:
+                        if entry.name.endswith('.json'):
+                            yield {
+                                'filename': entry.name,
+                                'provider': sanitized_provider,
+                                'full_path': entry.path,
+                                'mtime': entry.stat().st_mtime
+                            }
+            return
+        
+        # List files from all providers; DirEntry type info comes from
+        # the directory read itself, so no extra stat per entry
+        with os.scandir(self.base_results_dir) as items:
+            for item in items:
+                if item.is_dir():
+                    # This is a provider directory
+                    if providers is not None:
+                        providers.append(item.name)
+                    with os.scandir(item.path) as entries:
+                        for entry in entries:
+                            if entry.name.endswith('.json'):
+                                yield {
+                                    'filename': entry.name,
+                                    'provider': item.name,
+                                    'full_path': entry.path,
+                                    'mtime': entry.stat().st_mtime
+                                }
+                elif item.name.endswith('.json'):
+                    # Legacy file in root directory
+                    yield {
+                        'filename': item.name,
+                        'provider': 'root',
+                        'full_path': item.path,
+                        'mtime': item.stat().st_mtime
+                    }
+    
     def list_providers(self) -> list:
         """
         List all provider directories
@@ -259,11 +456,8 @@ class ResultsStorage:
             if not os.path.exists(self.base_results_dir):
                 return []
             
-            providers = []
-            for item in os.listdir(self.base_results_dir):
-                item_path = os.path.join(self.base_results_dir, item)
-                if os.path.isdir(item_path):
-                    providers.append(item)
+            with os.scandir(self.base_results_dir) as items:
+                providers = [item.name for item in items if item.is_dir()]
             
             return sorted(providers)
             
@@ -279,22 +473,29 @@ class ResultsStorage:
             Summary of results storage
         """
         try:
-            all_files = self.list_results_files()
-            providers = self.list_providers()
-            
-            # Group files by provider
+            # Files, providers and per-provider counts from a single directory walk,
+            # keeping only the latest 5 files in memory
+            providers = []
             provider_counts = {}
-            for file_info in all_files:
-                provider = file_info['provider']
-                provider_counts[provider] = provider_counts.get(provider, 0) + 1
+            
+            def counted(files):
+                for file_info in files:
+                    provider = file_info['provider']
+                    provider_counts[provider] = provider_counts.get(provider, 0) + 1
+                    yield file_info
+            
+            latest_results = heapq.nlargest(
+                5, counted(self._iter_results_files(providers=providers)), key=itemgetter('mtime')
+            )
+            providers.sort()
             
             summary = {
-                'total_results_files': len(all_files),
+                'total_results_files': sum(provider_counts.values()),
                 'total_providers': len(providers),
                 'results_directory': self.base_results_dir,
                 'providers': providers,
                 'provider_file_counts': provider_counts,
-                'latest_results': all_files[:5] if all_files else [],  # Latest 5 files
+                'latest_results': latest_results,  # Latest 5 files
                 'storage_info': {
                     'directory_exists': os.path.exists(self.base_results_dir),
                     'is_writable': os.access(self.base_results_dir, os.W_OK) if os.path.exists(self.base_results_dir) else False
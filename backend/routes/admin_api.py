@@ -1,25 +1,180 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, Response, current_app, request, jsonify, send_file
+from jinja2 import Template
+from sqlalchemy import case, func, text
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import raiseload
 from models import db, PortalAdapter, ExtractionJob
 from datetime import datetime
+from functools import lru_cache
+import importlib.util
 import os
 from pathlib import Path
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 admin_bp = Blueprint('admin', __name__)
 
+# Adapter scripts live here, relative to the working directory as before
+PORTAL_ADAPTERS_DIR = Path('portal_adapters')
+_PORTAL_ADAPTERS_STR = str(PORTAL_ADAPTERS_DIR)
+
+# adapter_id -> ((script mtime_ns, script size, rendered adapter fields), rendered HTML)
+# for view_adapter_script; any edit to the script or the adapter changes the key
+_script_view_cache = {}
+
+# Adapter listing serialized by SQLite in the shape of PortalAdapter.to_dict;
+# timestamps are stored as 'YYYY-MM-DD HH:MM:SS.ffffff' and isoformat() drops a
+# zero microsecond part. The aggregate runs as a window so its ORDER BY defines
+# the array order. It duplicates to_dict, so it is opt-in: set
+# ADMIN_DB_JSON_LISTING = True to use it.
+ADAPTERS_JSON_QUERY = """
+    SELECT json_group_array(json_object(
+        'id', id,
+        'name', name,
+        'description', description,
+        'script_filename', script_filename,
+        'is_active', json(CASE WHEN is_active IS NULL THEN 'null'
+                               WHEN is_active THEN 'true' ELSE 'false' END),
+        'created_at', replace(CASE WHEN created_at LIKE '%.000000'
+                                   THEN substr(created_at, 1, 19) ELSE created_at END, ' ', 'T'),
+        'updated_at', replace(CASE WHEN updated_at LIKE '%.000000'
+                                   THEN substr(updated_at, 1, 19) ELSE updated_at END, ' ', 'T')
+    )) OVER (ORDER BY created_at DESC
+             ROWS BETWEEN UNBOUNDED PRECEDING AND UNBOUNDED FOLLOWING)
+    FROM portal_adapters
+    LIMIT 1
+"""
+
+# Page for view_adapter_script, compiled once; autoescape keeps adapter fields and
+# script source from being interpreted as markup
+_SCRIPT_VIEW_TEMPLATE = Template("""
+        <!DOCTYPE html>
+        <html>
+        <head>
+            <title>{{ adapter.name }} - Adapter Script</title>
+            <link rel="stylesheet" href="https://cdnjs.cloudflare.com/ajax/libs/highlight.js/11.9.0/styles/default.min.css">
+            <script src="https://cdnjs.cloudflare.com/ajax/libs/highlight.js/11.9.0/highlight.min.js"></script>
+            <script src="https://cdnjs.cloudflare.com/ajax/libs/highlight.js/11.9.0/languages/python.min.js"></script>
+            <style>
+                body { 
+                    font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif; 
+                    margin: 0; 
+                    padding: 20px; 
+                    background-color: #f5f5f5; 
+                }
+                .header { 
+                    background: white; 
+                    padding: 20px; 
+                    border-radius: 8px; 
+                    margin-bottom: 20px; 
+                    box-shadow: 0 2px 4px rgba(0,0,0,0.1); 
+                }
+                .code-container { 
+                    background: white; 
+                    border-radius: 8px; 
+                    overflow: hidden; 
+                    box-shadow: 0 2px 4px rgba(0,0,0,0.1); 
+                }
+                pre { 
+                    margin: 0; 
+                    padding: 20px; 
+                    overflow-x: auto; 
+                }
+                .info { 
+                    color: #666; 
+                    font-size: 14px; 
+                }
+            </style>
+        </head>
+        <body>
+            <div class="header">
+                <h1>{{ adapter.name }}</h1>
+                <div class="info">
+                    <p><strong>Script:</strong> {{ adapter.script_filename }}</p>
+                    <p><strong>Description:</strong> {{ adapter.description or 'No description available' }}</p>
+                    <p><strong>Status:</strong> {{ 'Active' if adapter.is_active else 'Inactive' }}</p>
+                </div>
+            </div>
+            <div class="code-container">
+                <pre><code class="language-python">{{ script_content }}</code></pre>
+            </div>
+            <script>hljs.highlightAll();</script>
+        </body>
+        </html>
+        """, autoescape=True)
+
+# Job statuses that block deleting the job or its adapter
+ACTIVE_STATUSES = ('PENDING_LOGIN', 'LAUNCHING_BROWSER', 'AWAITING_USER_CONFIRMATION', 'EXTRACTING')
+
+# The IN filter on those statuses, built once and shared by the active-job counts;
+# with a portal_adapter_id filter it is served by ix_jobs_adapter_status_created
+_IS_ACTIVE_JOB = ExtractionJob.status.in_(ACTIVE_STATUSES)
+
+def jresp(payload, status=200):
+    """JSON response for the admin API, encoded with orjson when available.
+
+    Keys are sorted so the body matches what jsonify would send.
+    """
+    if orjson is None:
+        return jsonify(payload), status
+    return Response(
+        orjson.dumps(payload, option=orjson.OPT_SORT_KEYS | orjson.OPT_NAIVE_UTC),
+        status=status,
+        mimetype='application/json'
+    )
+
+def _exists(path):
+    """Existence check without building a stat result, unlike Path.exists()"""
+    return os.access(path, os.F_OK)
+
+def _is_duplicate(error: IntegrityError) -> bool:
+    """Whether an IntegrityError is a unique-constraint violation rather than e.g. NOT NULL"""
+    message = str(error.orig).lower()
+    return 'unique' in message or 'duplicate' in message
+
+def _duplicate_adapter_response(error: IntegrityError):
+    """Map a unique-constraint violation on portal_adapters to the API's 400 error"""
+    # Every backend names the offending column or its index in the message
+    if 'script_filename' in str(error.orig):
+        message = 'Adapter with this script filename already exists'
+    else:
+        message = 'Adapter with this name already exists'
+    return jresp({
+        'success': False,
+        'error': message
+    }, 400)
+
 @admin_bp.route('/adapters', methods=['GET'])
 def get_all_adapters():
     """Get all portal adapters (including inactive ones)"""
     try:
-        adapters = PortalAdapter.query.order_by(PortalAdapter.created_at.desc()).all()
-        return jsonify({
+        if (current_app.config.get('ADMIN_DB_JSON_LISTING', False)
+                and db.engine.dialect.name == 'sqlite'):
+            # SQLite builds the adapter array itself, matching to_dict field for field;
+            # an empty table yields no row
+            adapters_json = db.session.execute(text(ADAPTERS_JSON_QUERY)).scalar() or '[]'
+            return Response(
+                b'{"success":true,"adapters":' + adapters_json.encode('utf-8') + b'}',
+                mimetype='application/json'
+            )
+        
+        # to_dict only reads columns; raiseload keeps the listing a single query by
+        # failing loudly if serialization ever starts lazy-loading extraction_jobs per adapter
+        adapters = PortalAdapter.query.options(
+            raiseload('*')
+        ).order_by(PortalAdapter.created_at.desc()).all()
+        return jresp({
             'success': True,
             'adapters': [adapter.to_dict() for adapter in adapters]
         })
     except Exception as e:
-        return jsonify({
+        return jresp({
             'success': False,
             'error': f'Failed to fetch adapters: {str(e)}'
-        }), 500
+        }, 500)
 
 @admin_bp.route('/adapters', methods=['POST'])
 def create_adapter():
@@ -31,34 +186,18 @@ def create_adapter():
         required_fields = ['name', 'script_filename']
         for field in required_fields:
             if field not in data:
-                return jsonify({
+                return jresp({
                     'success': False,
                     'error': f'Missing required field: {field}'
-                }), 400
-        
-        # Check if name already exists
-        existing_adapter = PortalAdapter.query.filter_by(name=data['name']).first()
-        if existing_adapter:
-            return jsonify({
-                'success': False,
-                'error': 'Adapter with this name already exists'
-            }), 400
-        
-        # Check if script_filename already exists
-        existing_script = PortalAdapter.query.filter_by(script_filename=data['script_filename']).first()
-        if existing_script:
-            return jsonify({
-                'success': False,
-                'error': 'Adapter with this script filename already exists'
-            }), 400
+                }, 400)
         
         # Validate that script file exists
-        script_path = Path('portal_adapters') / data['script_filename']
-        if not script_path.exists():
-            return jsonify({
+        script_path = PORTAL_ADAPTERS_DIR / data['script_filename']
+        if not _exists(script_path):
+            return jresp({
                 'success': False,
                 'error': f'Script file not found: {script_path}'
-            }), 400
+            }, 400)
         
         # Create new adapter
         adapter = PortalAdapter(
@@ -68,133 +207,128 @@ def create_adapter():
             is_active=data.get('is_active', True)
         )
         
+        # The unique constraints on name and script_filename reject duplicates
+        # without a separate lookup query for each
         db.session.add(adapter)
-        db.session.commit()
+        try:
+            db.session.commit()
+        except IntegrityError as e:
+            db.session.rollback()
+            if not _is_duplicate(e):
+                raise
+            return _duplicate_adapter_response(e)
         
-        return jsonify({
+        return jresp({
             'success': True,
             'adapter': adapter.to_dict()
-        }), 201
+        }, 201)
         
     except Exception as e:
         db.session.rollback()
-        return jsonify({
+        return jresp({
             'success': False,
             'error': f'Failed to create adapter: {str(e)}'
-        }), 500
+        }, 500)
 
-@admin_bp.route('/adapters/<int:adapter_id>', methods=['PUT'])
+@admin_bp.route('/adapters/<int(min=1):adapter_id>', methods=['PUT'])
 def update_adapter(adapter_id):
     """Update an existing portal adapter"""
     try:
-        adapter = PortalAdapter.query.get(adapter_id)
+        adapter = db.session.get(PortalAdapter, adapter_id)
         if not adapter:
-            return jsonify({
+            return jresp({
                 'success': False,
                 'error': 'Adapter not found'
-            }), 404
+            }, 404)
         
         data = request.get_json()
         
         # Update fields if provided
+        # Name and script filename conflicts are caught by the unique constraints on commit
         if 'name' in data:
-            # Check if new name conflicts with existing adapter
-            existing_adapter = PortalAdapter.query.filter(
-                PortalAdapter.name == data['name'],
-                PortalAdapter.id != adapter_id
-            ).first()
-            if existing_adapter:
-                return jsonify({
-                    'success': False,
-                    'error': 'Adapter with this name already exists'
-                }), 400
             adapter.name = data['name']
         
         if 'description' in data:
             adapter.description = data['description']
         
         if 'script_filename' in data:
-            # Check if new script filename conflicts with existing adapter
-            existing_script = PortalAdapter.query.filter(
-                PortalAdapter.script_filename == data['script_filename'],
-                PortalAdapter.id != adapter_id
-            ).first()
-            if existing_script:
-                return jsonify({
-                    'success': False,
-                    'error': 'Adapter with this script filename already exists'
-                }), 400
-            
             # Validate that script file exists
-            script_path = Path('portal_adapters') / data['script_filename']
-            if not script_path.exists():
-                return jsonify({
+            script_path = PORTAL_ADAPTERS_DIR / data['script_filename']
+            if not _exists(script_path):
+                return jresp({
                     'success': False,
                     'error': f'Script file not found: {script_path}'
-                }), 400
+                }, 400)
             
             adapter.script_filename = data['script_filename']
         
         if 'is_active' in data:
             adapter.is_active = bool(data['is_active'])
         
-        adapter.updated_at = datetime.utcnow()
-        db.session.commit()
-        
-        return jsonify({
+        # Requests that change no column skip the commit round trip entirely
+        if db.session.is_modified(adapter):
+            try:
+                db.session.commit()
+            except IntegrityError as e:
+                db.session.rollback()
+                if not _is_duplicate(e):
+                    raise
+                return _duplicate_adapter_response(e)
+        
+        return jresp({
             'success': True,
             'adapter': adapter.to_dict()
         })
         
     except Exception as e:
         db.session.rollback()
-        return jsonify({
+        return jresp({
             'success': False,
             'error': f'Failed to update adapter: {str(e)}'
-        }), 500
+        }, 500)
 
-@admin_bp.route('/adapters/<int:adapter_id>', methods=['DELETE'])
+@admin_bp.route('/adapters/<int(min=1):adapter_id>', methods=['DELETE'])
 def delete_adapter(adapter_id):
     """Delete a portal adapter (hard delete if file doesn't exist, otherwise soft delete)"""
     try:
-        adapter = PortalAdapter.query.get(adapter_id)
+        adapter = db.session.get(PortalAdapter, adapter_id)
         if not adapter:
-            return jsonify({
+            return jresp({
                 'success': False,
                 'error': 'Adapter not found'
-            }), 404
+            }, 404)
         
-        # Check if adapter has active jobs
-        active_jobs = ExtractionJob.query.filter_by(
-            portal_adapter_id=adapter_id
-        ).filter(
-            ExtractionJob.status.in_(['PENDING_LOGIN', 'LAUNCHING_BROWSER', 'AWAITING_USER_CONFIRMATION', 'EXTRACTING'])
-        ).count()
+        # Check if adapter has active jobs; counting the key column avoids Query.count()
+        # wrapping a full-row SELECT in a subquery
+        active_jobs = db.session.query(func.count(ExtractionJob.id)).filter(
+            ExtractionJob.portal_adapter_id == adapter_id,
+            _IS_ACTIVE_JOB
+        ).scalar()
         
         if active_jobs > 0:
-            return jsonify({
+            return jresp({
                 'success': False,
                 'error': f'Cannot delete adapter with {active_jobs} active jobs. Please wait for jobs to complete or fail.'
-            }), 400
+            }, 400)
         
         # Check if adapter file exists in filesystem
-        script_path = Path('portal_adapters') / adapter.script_filename
-        file_exists = script_path.exists()
+        script_path = PORTAL_ADAPTERS_DIR / adapter.script_filename
+        file_exists = _exists(script_path)
         
         if file_exists:
             # File exists - provide warning that file should be removed first
-            return jsonify({
+            return jresp({
                 'success': False,
                 'error': f'Cannot delete adapter: File "{adapter.script_filename}" still exists in portal_adapters directory. Please remove the file first or use sync to handle it automatically.',
                 'file_exists': True,
                 'suggestion': 'Use the "Sync Adapters" feature to automatically handle file deletions.'
-            }), 400
+            }, 400)
         else:
             # File doesn't exist - safe to delete from database
             db.session.delete(adapter)
             db.session.commit()
             
-            return jsonify({
+            return jresp({
                 'success': True,
                 'message': f'Adapter "{adapter.name}" deleted successfully from database',
                 'file_exists': False
@@ -202,299 +336,282 @@ def delete_adapter(adapter_id):
         
     except Exception as e:
         db.session.rollback()
-        return jsonify({
+        return jresp({
             'success': False,
             'error': f'Failed to delete adapter: {str(e)}'
-        }), 500
+        }, 500)
+
+@lru_cache(maxsize=256)
+def _validate_script(path_str, mtime_ns, size):
+    """Import an adapter script and check its required functions.
+
+    Returns an error message, or None when the script is valid. The mtime and
+    size are part of the cache key so an edited script is validated again.
+    """
+    spec = importlib.util.spec_from_file_location("adapter_module", path_str)
+    adapter_module = importlib.util.module_from_spec(spec)
+    
+    try:
+        spec.loader.exec_module(adapter_module)
+    except Exception as import_error:
+        return f'Script import failed: {str(import_error)}'
+    
+    # Check for required functions
+    required_functions = ['extract_single_patient_data', 'extract_all_patients_data']
+    missing_functions = [
+        func_name for func_name in required_functions
+        if not hasattr(adapter_module, func_name)
+    ]
+    
+    if missing_functions:
+        return f'Missing required functions: {", ".join(missing_functions)}'
+    return None
 
 @admin_bp.route('/adapters/validate_script/<script_filename>', methods=['GET'])
 def validate_adapter_script(script_filename):
     """Validate that an adapter script exists and has required functions"""
     try:
-        script_path = Path('portal_adapters') / script_filename
+        script_path = PORTAL_ADAPTERS_DIR / script_filename
         
-        if not script_path.exists():
-            return jsonify({
+        try:
+            stat = os.stat(script_path)
+        except FileNotFoundError:
+            return jresp({
                 'success': False,
                 'error': 'Script file not found',
                 'valid': False
             })
         
-        # Try to import and validate the script
-        import importlib.util
-        spec = importlib.util.spec_from_file_location("adapter_module", script_path)
-        adapter_module = importlib.util.module_from_spec(spec)
-        
-        try:
-            spec.loader.exec_module(adapter_module)
-        except Exception as import_error:
-            return jsonify({
-                'success': True,
-                'valid': False,
-                'error': f'Script import failed: {str(import_error)}'
-            })
-        
-        # Check for required functions
-        required_functions = ['extract_single_patient_data', 'extract_all_patients_data']
-        missing_functions = []
-        
-        for func_name in required_functions:
-            if not hasattr(adapter_module, func_name):
-                missing_functions.append(func_name)
-        
-        if missing_functions:
-            return jsonify({
+        # Reuse the result while the script file is unchanged
+        error = _validate_script(str(script_path), stat.st_mtime_ns, stat.st_size)
+        if error:
+            return jresp({
                 'success': True,
                 'valid': False,
-                'error': f'Missing required functions: {", ".join(missing_functions)}'
+                'error': error
             })
         
-        return jsonify({
+        return jresp({
             'success': True,
             'valid': True,
             'message': 'Script is valid and contains all required functions'
         })
         
     except Exception as e:
-        return jsonify({
+        return jresp({
             'success': False,
             'error': f'Failed to validate script: {str(e)}'
-        }), 500
+        }, 500)
 
 @admin_bp.route('/adapters/available_scripts', methods=['GET'])
 def get_available_scripts():
     """Get list of available adapter scripts in the portal_adapters directory"""
     try:
-        portal_adapters_dir = Path('portal_adapters')
-        
-        if not portal_adapters_dir.exists():
-            return jsonify({
+        if not _exists(PORTAL_ADAPTERS_DIR):
+            return jresp({
                 'success': True,
                 'scripts': []
             })
         
-        # Find all Python files in the directory
+        # Find all Python files in the directory; one stat per DirEntry covers size and mtime
         scripts = []
-        for script_file in portal_adapters_dir.glob('*.py'):
-            if script_file.name.startswith('_'):
-                continue  # Skip template files or private files
-            
-            scripts.append({
-                'filename': script_file.name,
-                'size': script_file.stat().st_size,
-                'modified': datetime.fromtimestamp(script_file.stat().st_mtime).isoformat()
-            })
-        
-        return jsonify({
+        with os.scandir(PORTAL_ADAPTERS_DIR) as entries:
+            for entry in entries:
+                if not entry.name.endswith('.py') or entry.name.startswith('.'):
+                    continue
+                if entry.name.startswith('_'):
+                    continue  # Skip template files or private files
+                if not entry.is_file():
+                    continue
+                
+                stat = entry.stat()
+                scripts.append({
+                    'filename': entry.name,
+                    'size': stat.st_size,
+                    'modified': datetime.fromtimestamp(stat.st_mtime).isoformat()
+                })
+        
+        return jresp({
             'success': True,
             'scripts': sorted(scripts, key=lambda x: x['filename'])
         })
         
     except Exception as e:
-        return jsonify({
+        return jresp({
             'success': False,
             'error': f'Failed to get available scripts: {str(e)}'
-        }), 500
+        }, 500)
 
-@admin_bp.route('/adapters/<int:adapter_id>/download', methods=['GET'])
+@admin_bp.route('/adapters/<int(min=1):adapter_id>/download', methods=['GET'])
 def download_adapter_script(adapter_id):
     """Download the adapter script file"""
     try:
-        adapter = PortalAdapter.query.get(adapter_id)
+        adapter = db.session.get(PortalAdapter, adapter_id)
         if not adapter:
-            return jsonify({
+            return jresp({
                 'success': False,
                 'error': 'Adapter not found'
-            }), 404
+            }, 404)
         
-        script_path = Path('portal_adapters') / adapter.script_filename
+        script_path = PORTAL_ADAPTERS_DIR / adapter.script_filename
         
-        if not script_path.exists():
-            return jsonify({
+        try:
+            stat = os.stat(script_path)
+        except FileNotFoundError:
+            return jresp({
                 'success': False,
                 'error': 'Script file not found'
-            }), 404
+            }, 404)
         
-        from flask import send_file
+        # Conditional response: clients holding an unchanged copy get a 304
         return send_file(
             script_path,
             as_attachment=True,
             download_name=adapter.script_filename,
-            mimetype='text/plain'
+            mimetype='text/plain',
+            conditional=True,
+            etag=True,
+            last_modified=stat.st_mtime
         )
         
     except Exception as e:
-        return jsonify({
+        return jresp({
             'success': False,
             'error': f'Failed to download script: {str(e)}'
-        }), 500
+        }, 500)
 
-@admin_bp.route('/adapters/<int:adapter_id>/view', methods=['GET'])
+@admin_bp.route('/adapters/<int(min=1):adapter_id>/view', methods=['GET'])
 def view_adapter_script(adapter_id):
     """View the adapter script content"""
     try:
-        adapter = PortalAdapter.query.get(adapter_id)
+        adapter = db.session.get(PortalAdapter, adapter_id)
         if not adapter:
-            return jsonify({
+            return jresp({
                 'success': False,
                 'error': 'Adapter not found'
-            }), 404
+            }, 404)
         
-        script_path = Path('portal_adapters') / adapter.script_filename
+        script_path = PORTAL_ADAPTERS_DIR / adapter.script_filename
         
-        if not script_path.exists():
-            return jsonify({
+        try:
+            stat = os.stat(script_path)
+        except FileNotFoundError:
+            return jresp({
                 'success': False,
                 'error': 'Script file not found'
-            }), 404
+            }, 404)
+        
+        # Serve the page rendered for this version of the script and adapter
+        # Keyed on the fields the page shows, as updated_at only has second resolution
+        cache_key = (stat.st_mtime_ns, stat.st_size, adapter.name, adapter.script_filename,
+                     adapter.description, adapter.is_active)
+        cached = _script_view_cache.get(adapter_id)
+        if cached and cached[0] == cache_key:
+            return Response(cached[1], mimetype='text/html')
         
         # Read the script content
         with open(script_path, 'r', encoding='utf-8') as f:
             script_content = f.read()
         
-        # Return as HTML with syntax highlighting
-        html_content = f"""
-        <!DOCTYPE html>
-        <html>
-        <head>
-            <title>{adapter.name} - Adapter Script</title>
-            <link rel="stylesheet" href="https://cdnjs.cloudflare.com/ajax/libs/highlight.js/11.9.0/styles/default.min.css">
-            <script src="https://cdnjs.cloudflare.com/ajax/libs/highlight.js/11.9.0/highlight.min.js"></script>
-            <script src="https://cdnjs.cloudflare.com/ajax/libs/highlight.js/11.9.0/languages/python.min.js"></script>
-            <style>
-                body {{ 
-                    font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif; 
-                    margin: 0; 
-                    padding: 20px; 
-                    background-color: #f5f5f5; 
-                }}
-                .header {{ 
-                    background: white; 
-                    padding: 20px; 
-                    border-radius: 8px; 
-                    margin-bottom: 20px; 
-                    box-shadow: 0 2px 4px rgba(0,0,0,0.1); 
-                }}
-                .code-container {{ 
-                    background: white; 
-                    border-radius: 8px; 
-                    overflow: hidden; 
-                    box-shadow: 0 2px 4px rgba(0,0,0,0.1); 
-                }}
-                pre {{ 
-                    margin: 0; 
-                    padding: 20px; 
-                    overflow-x: auto; 
-                }}
-                .info {{ 
-                    color: #666; 
-                    font-size: 14px; 
-                }}
-            </style>
-        </head>
-        <body>
-            <div class="header">
-                <h1>{adapter.name}</h1>
-                <div class="info">
-                    <p><strong>Script:</strong> {adapter.script_filename}</p>
-                    <p><strong>Description:</strong> {adapter.description or 'No description available'}</p>
-                    <p><strong>Status:</strong> {'Active' if adapter.is_active else 'Inactive'}</p>
-                </div>
-            </div>
-            <div class="code-container">
-                <pre><code class="language-python">{script_content}</code></pre>
-            </div>
-            <script>hljs.highlightAll();</script>
-        </body>
-        </html>
-        """
+        # Return as HTML with syntax highlighting; the template escapes every value
+        html_content = _SCRIPT_VIEW_TEMPLATE.render(
+            adapter=adapter,
+            script_content=script_content
+        )
         
-        from flask import Response
+        _script_view_cache[adapter_id] = (cache_key, html_content)
         return Response(html_content, mimetype='text/html')
         
     except Exception as e:
-        return jsonify({
+        return jresp({
             'success': False,
             'error': f'Failed to view script: {str(e)}'
-        }), 500
+        }, 500)
 
-@admin_bp.route('/jobs/<int:job_id>', methods=['DELETE'])
+@admin_bp.route('/jobs/<int(min=1):job_id>', methods=['DELETE'])
 def delete_job(job_id):
     """Delete a job (hard delete from database)"""
     try:
-        job = ExtractionJob.query.get(job_id)
+        job = db.session.get(ExtractionJob, job_id)
         if not job:
-            return jsonify({
+            return jresp({
                 'success': False,
                 'error': 'Job not found'
-            }), 404
+            }, 404)
         
         # Check if job is currently active
-        if job.status in ['PENDING_LOGIN', 'LAUNCHING_BROWSER', 'AWAITING_USER_CONFIRMATION', 'EXTRACTING']:
-            return jsonify({
+        if job.status in ACTIVE_STATUSES:
+            return jresp({
                 'success': False,
                 'error': 'Cannot delete active job. Please wait for job to complete or fail.'
-            }), 400
+            }, 400)
         
         db.session.delete(job)
         db.session.commit()
         
-        return jsonify({
+        return jresp({
             'success': True,
             'message': 'Job deleted successfully'
         })
         
     except Exception as e:
         db.session.rollback()
-        return jsonify({
+        return jresp({
             'success': False,
             'error': f'Failed to delete job: {str(e)}'
-        }), 500
+        }, 500)
 
 @admin_bp.route('/adapters/check-file/<script_filename>', methods=['GET'])
 def check_adapter_file_exists(script_filename):
     """Check if an adapter file exists in the filesystem"""
     try:
-        # Get the portal_adapters directory path
-        script_path = Path('portal_adapters') / script_filename
-        file_exists = script_path.exists()
+        # Only bare adapter script names may be checked, never paths out of the directory
+        name = os.path.basename(script_filename)
+        if name != script_filename or not name.endswith('.py'):
+            return jresp({
+                'success': False,
+                'error': 'Invalid script filename'
+            }, 400)
         
-        return jsonify({
+        # Get the portal_adapters directory path; a plain string join skips building a Path
+        script_path = os.path.join(_PORTAL_ADAPTERS_STR, name)
+        file_exists = _exists(script_path)
+        
+        return jresp({
             'success': True,
             'exists': file_exists,
             'script_filename': script_filename,
-            'file_path': str(script_path) if file_exists else None
+            'file_path': script_path if file_exists else None
         })
         
     except Exception as e:
-        return jsonify({
+        return jresp({
             'success': False,
             'error': f'Failed to check adapter file: {str(e)}'
-        }), 500
+        }, 500)
 
-@admin_bp.route('/adapters/<int:adapter_id>/force-delete', methods=['DELETE'])
+@admin_bp.route('/adapters/<int(min=1):adapter_id>/force-delete', methods=['DELETE'])
 def force_delete_adapter(adapter_id):
     """Force delete adapter by deleting all associated jobs first"""
     try:
-        adapter = PortalAdapter.query.get(adapter_id)
+        adapter = db.session.get(PortalAdapter, adapter_id)
         if not adapter:
-            return jsonify({
+            return jresp({
                 'success': False,
                 'error': 'Adapter not found'
-            }), 404
+            }, 404)
         
         # First, delete all associated jobs (since portal_adapter_id cannot be NULL)
-        associated_jobs = ExtractionJob.query.filter_by(portal_adapter_id=adapter_id).all()
-        job_count = len(associated_jobs)
-        
-        for job in associated_jobs:
-            db.session.delete(job)
+        # in one DELETE statement instead of loading and deleting each job
+        job_count = ExtractionJob.query.filter_by(
+            portal_adapter_id=adapter_id
+        ).delete(synchronize_session=False)
         
         # Now delete the adapter
         db.session.delete(adapter)
         db.session.commit()
         
-        return jsonify({
+        return jresp({
             'success': True,
             'message': f'Adapter "{adapter.name}" and {job_count} associated job(s) deleted successfully',
             'deleted_jobs': job_count,
@@ -503,33 +620,31 @@ def force_delete_adapter(adapter_id):
         
     except Exception as e:
         db.session.rollback()
-        return jsonify({
+        return jresp({
             'success': False,
             'error': f'Failed to force delete adapter: {str(e)}'
-        }), 500
+        }, 500)
 
-@admin_bp.route('/adapters/<int:adapter_id>/dependent-jobs', methods=['GET'])
+@admin_bp.route('/adapters/<int(min=1):adapter_id>/dependent-jobs', methods=['GET'])
 def check_adapter_dependent_jobs(adapter_id):
     """Check if adapter has dependent jobs"""
     try:
-        adapter = PortalAdapter.query.get(adapter_id)
+        adapter = db.session.get(PortalAdapter, adapter_id)
         if not adapter:
-            return jsonify({
+            return jresp({
                 'success': False,
                 'error': 'Adapter not found'
-            }), 404
-        
-        # Count all jobs associated with this adapter
-        all_jobs = ExtractionJob.query.filter_by(portal_adapter_id=adapter_id).count()
+            }, 404)
         
-        # Count active jobs
-        active_jobs = ExtractionJob.query.filter_by(
-            portal_adapter_id=adapter_id
-        ).filter(
-            ExtractionJob.status.in_(['PENDING_LOGIN', 'LAUNCHING_BROWSER', 'AWAITING_USER_CONFIRMATION', 'EXTRACTING'])
-        ).count()
+        # Count all and active jobs associated with this adapter in one query
+        counts = db.session.query(
+            func.count(ExtractionJob.id).label('total'),
+            func.sum(case((_IS_ACTIVE_JOB, 1), else_=0)).label('active')
+        ).filter(ExtractionJob.portal_adapter_id == adapter_id).one()
+        all_jobs = counts.total
+        active_jobs = int(counts.active or 0)
         
-        return jsonify({
+        return jresp({
             'success': True,
             'has_dependencies': all_jobs > 0,
             'job_count': all_jobs,
@@ -539,7 +654,7 @@ def check_adapter_dependent_jobs(adapter_id):
         })
         
     except Exception as e:
-        return jsonify({
+        return jresp({
             'success': False,
             'error': f'Failed to check adapter dependencies: {str(e)}'
-        }), 500 
\ No newline at end of file
+        }, 500) 
\ No newline at end of file
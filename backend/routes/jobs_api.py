@@ -1,4 +1,4 @@
-from flask import Blueprint, request, jsonify, current_app
+from flask import Blueprint, request, jsonify, current_app, Response, stream_with_context
 from models import db, PortalAdapter, ExtractionJob
 from datetime import datetime
 import sys
@@ -8,6 +8,11 @@ import json
 import os
 from sqlalchemy import text
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 # Add the project root to the Python path for imports
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
 
@@ -332,10 +337,23 @@ def get_jobs():
         # Limit per_page to prevent abuse
         per_page = min(per_page, 100)
         
-        # Get jobs with pagination AND eager loading of adapters to prevent N+1 queries
-        jobs_query = ExtractionJob.query.options(
-            db.joinedload(ExtractionJob.adapter)
-        ).order_by(ExtractionJob.created_at.desc())
+        # Extracted payloads can be large; callers that only need status can skip them
+        include_data = request.args.get('include_data', 'true').lower() != 'false'
+        
+        # Optional filters (served by the adapter/status/created_at index)
+        adapter_id = request.args.get('adapter_id', type=int)
+        status = request.args.get('status')
+        
+        # adapter_name comes from a column_property, so no adapter join is needed
+        jobs_query = ExtractionJob.query
+        if include_data:
+            # Fetch the deferred payload in the same query instead of once per job
+            jobs_query = jobs_query.options(db.undefer(ExtractionJob.raw_extracted_data_json))
+        if adapter_id is not None:
+            jobs_query = jobs_query.filter(ExtractionJob.portal_adapter_id == adapter_id)
+        if status:
+            jobs_query = jobs_query.filter(ExtractionJob.status == status)
+        jobs_query = jobs_query.order_by(ExtractionJob.created_at.desc())
         
         jobs_pagination = jobs_query.paginate(
             page=page, 
@@ -345,7 +363,7 @@ def get_jobs():
         
         return jsonify({
             'success': True,
-            'jobs': [job.to_dict() for job in jobs_pagination.items],
+            'jobs': [job.to_dict(include_extracted_data=include_data) for job in jobs_pagination.items],
             'pagination': {
                 'page': page,
                 'pages': jobs_pagination.pages,
@@ -362,6 +380,30 @@ def get_jobs():
             'error': f'Failed to fetch jobs: {str(e)}'
         }), 500
 
+@jobs_bp.route('/jobs.ndjson', methods=['GET'])
+def stream_jobs():
+    """Stream all jobs as newline-delimited JSON, one job per line"""
+    adapter_id = request.args.get('adapter_id', type=int)
+    status = request.args.get('status')
+    
+    jobs_query = ExtractionJob.query
+    if adapter_id is not None:
+        jobs_query = jobs_query.filter(ExtractionJob.portal_adapter_id == adapter_id)
+    if status:
+        jobs_query = jobs_query.filter(ExtractionJob.status == status)
+    jobs_query = jobs_query.order_by(ExtractionJob.created_at.desc())
+    
+    def generate():
+        # yield_per fetches rows in batches so memory stays flat for large job tables
+        for job in jobs_query.yield_per(500):
+            job_dict = job.to_dict(include_extracted_data=False)
+            if orjson is not None:
+                yield orjson.dumps(job_dict, default=str) + b'\n'
+            else:
+                yield (json.dumps(job_dict, default=str) + '\n').encode('utf-8')
+    
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
 @jobs_bp.route('/jobs/active', methods=['GET'])
 def get_active_jobs():
     """Get currently active jobs from the Playwright orchestrator"""
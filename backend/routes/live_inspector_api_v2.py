@@ -329,7 +329,7 @@ def get_live_inspection_status_v2(inspection_id):
         # Add additional status info if inspector is available
         if inspector:
             status_info.update({
-                'events_count': len(inspector.events),
+                'events_count': inspector.events_count,
                 'forms_discovered': len(inspector.forms_discovered),
                 'tables_discovered': len(inspector.tables_discovered),
                 'navigation_flow_length': len(inspector.navigation_flow),
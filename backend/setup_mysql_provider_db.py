@@ -58,13 +58,16 @@ class MySQLSetupManager:
             # Step 3: Discover Existing Providers
             self._discover_existing_providers()
             
-            # Step 4: Process Existing JSON Files
+            # Step 4: Apply Provider Index Migrations
+            self._apply_index_migrations()
+            
+            # Step 5: Process Existing JSON Files
             self._process_existing_files()
             
-            # Step 5: Setup File Monitoring
+            # Step 6: Setup File Monitoring
             self._setup_file_monitoring()
             
-            # Step 6: Generate Setup Report
+            # Step 7: Generate Setup Report
             self._generate_setup_report()
             
             logger.info("✅ Setup completed successfully!")
@@ -172,9 +175,25 @@ class MySQLSetupManager:
             self.setup_results['errors'].append(error_msg)
             raise
     
+    def _apply_index_migrations(self):
+        """Add indexes introduced after provider databases were created"""
+        logger.info("Step 4: Applying Provider Index Migrations...")
+        
+        for provider in provider_db_manager.list_providers():
+            database_name = provider['database_name']
+            try:
+                provider_db_manager.apply_index_migrations(database_name)
+                logger.info(f"   🗂️  Indexes checked: {database_name}")
+            except Exception as e:
+                warning_msg = f"Index migration failed for {database_name}: {str(e)}"
+                logger.warning(f"⚠️  {warning_msg}")
+                self.setup_results['warnings'].append(warning_msg)
+        
+        self.setup_results['steps_completed'].append('index_migrations')
+    
     def _process_existing_files(self):
         """Process all existing JSON files"""
-        logger.info("Step 4: Processing Existing JSON Files...")
+        logger.info("Step 5: Processing Existing JSON Files...")
         
         try:
             # Change to parent directory to access Results folder correctly
@@ -213,7 +232,7 @@ class MySQLSetupManager:
     
     def _setup_file_monitoring(self):
         """Setup automatic file monitoring"""
-        logger.info("Step 5: Setting Up File Monitoring...")
+        logger.info("Step 6: Setting Up File Monitoring...")
         
         try:
             # Note: We don't start monitoring automatically during setup
@@ -233,7 +252,7 @@ class MySQLSetupManager:
     
     def _generate_setup_report(self):
         """Generate comprehensive setup report"""
-        logger.info("Step 6: Generating Setup Report...")
+        logger.info("Step 7: Generating Setup Report...")
         
         try:
             # Get comprehensive statistics
@@ -323,7 +323,7 @@ const JobProgressTracker = ({ job, onJobUpdate, onDelete, onConfirmLogin, isExpa
                             </div>
                         )}
 
-                        {job.raw_extracted_data_json && (
+                        {(job.has_extracted_data || job.raw_extracted_data_json) && (
                             <div>
                                 <p className="text-xs font-medium text-green-500">Extraction Completed:</p>
                                 <p className="text-sm text-green-700">Data successfully extracted</p>
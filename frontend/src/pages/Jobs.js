@@ -436,7 +436,8 @@ const Jobs = () => {
 
     const fetchJobs = async () => {
         try {
-            const response = await jobsApi.getAll(currentPage, 20);
+            // The jobs list only needs status, not the extracted payloads
+            const response = await jobsApi.getAll(currentPage, 20, null, false);
             const jobsData = response.data.jobs || [];
             const paginationData = response.data.pagination || { pages: 1 };
 
@@ -38,7 +38,7 @@ const LiveInspection = () => {
             setInspectionStatus('🚀 Advanced inspection started - browser launching...');
         });
 
-        newSocket.on('live_inspection_update', (data) => {
+        const handleInspectionUpdate = (data) => {
             console.log('Live inspection update:', data);
             setInspectionLogs(prev => [...prev, {
                 type: data.event?.event_type || 'update',
@@ -58,6 +58,13 @@ const LiveInspection = () => {
             } else {
                 setInspectionStatus('📊 Recording user interactions...');
             }
+        };
+
+        newSocket.on('live_inspection_update', handleInspectionUpdate);
+
+        // The advanced inspector sends events in batches
+        newSocket.on('live_inspection_update_batch', (data) => {
+            (data.events || []).forEach(handleInspectionUpdate);
         });
 
         newSocket.on('live_inspection_complete_v2', (data) => {
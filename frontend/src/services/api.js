@@ -102,8 +102,11 @@ api.interceptors.response.use(
 // API endpoints using centralized configuration
 export const jobsApi = {
     create: (jobData) => api.post(API_ENDPOINTS.JOBS, jobData),
-    getAll: async (page = 1, perPage = 20, noCacheHeaders = null) => {
-        const cacheKey = `jobs-${page}-${perPage}`;
+    getAll: async (page = 1, perPage = 20, noCacheHeaders = null, includeData = true) => {
+        const cacheKey = `jobs-${page}-${perPage}-${includeData ? 'full' : 'lite'}`;
+        const params = includeData
+            ? { page, per_page: perPage }
+            : { page, per_page: perPage, include_data: false };
 
         // Skip cache if no-cache headers provided
         if (!noCacheHeaders) {
@@ -112,10 +115,10 @@ export const jobsApi = {
         }
 
         const requestConfig = noCacheHeaders ? {
-            params: { page, per_page: perPage },
+            params,
             headers: noCacheHeaders
         } : {
-            params: { page, per_page: perPage }
+            params
         };
 
         const response = await api.get(API_ENDPOINTS.JOBS, requestConfig);